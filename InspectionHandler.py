@@ -3,8 +3,10 @@ import time
 from functools import partial
 from src.MQTT_Camera import MQTTClient
 from src.OPC_UA_Subscriber_RFID_Reader import OPC_UA_Subscriber
+from config.env_config import settings
+from src.utils.DetectionAggregator import DetectionAggregator
 from src.utils.Logger import SingletonLogger
-from src.utils.util_inspection_response import get_simplified_inspection_response, create_response_plan
+from src.utils.util_inspection_response import create_response_plan
 
 logger = SingletonLogger()
 
@@ -40,7 +42,8 @@ class InspectionHandler:
             Disconnects the MQTT client and OPC UA subscriber from their respective services.
 
         get_inspection_response(self, inspection_plan):
-            Requests a camera inspection response via MQTT, processes the response, and generates an inspection response plan.
+            Requests camera inspection responses via MQTT, aggregates the frames of the vehicle pass, and generates
+            an inspection response plan.
 
         run_loop(self):
             Main loop that keeps testing the OPC UA connection and handles inspection process.
@@ -106,20 +109,33 @@ class InspectionHandler:
 
     def get_inspection_response(self, inspection_plan):
         """
-        Requests a camera inspection response via MQTT, processes the response, and generates an inspection response plan.
+        Requests camera inspection responses via MQTT, and generates an inspection response plan.
+
+        Up to `inspection_frames` frames are requested within `inspection_deadline` seconds and combined per class
+        with the `inspection_aggregation` rule. With the default of one frame this is a single camera request.
 
         Args:
             inspection_plan (dict): The inspection plan received from the OPC UA subscriber.
 
         Returns:
-            dict: The generated inspection response plan.
+            dict: The generated inspection response plan, or None if no camera frame arrived before the deadline.
         """
-        camera_response = self.mqtt_client.request_response_cv(
-            message="Triggering Camera", timeout=2)
-        camera_response_simplified = get_simplified_inspection_response(
-            camera_response, 0.6)
+        aggregator = DetectionAggregator(rule=settings.inspection_aggregation, frame_count=settings.inspection_frames,
+                                         timeout=settings.inspection_deadline, threshold=0.6,
+                                         alpha=settings.inspection_ewma_alpha)
+        while not aggregator.is_complete():
+            camera_response = self.mqtt_client.request_response_cv(
+                message="Triggering Camera",
+                timeout=min(aggregator.remaining_time(), self.mqtt_client.get_adaptive_timeout()))
+            if camera_response is not None:
+                aggregator.add_frame(camera_response)
+        if aggregator.frames == 0:
+            # Without a frame every class would be reported as not in place
+            logger.warning(f"No camera frame within {settings.inspection_deadline} seconds, no inspection response")
+            return None
+        camera_response_simplified = aggregator.result()
         inspection_response = create_response_plan(
-            inspection_plan, camera_response_simplified)
+            inspection_plan, camera_response_simplified, aggregator.missing_cameras)
         logger.info(f"Created Inspection Response: {inspection_response}")
         return inspection_response
 
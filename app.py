@@ -2,7 +2,9 @@ import json
 from flask import Flask, render_template, redirect, url_for, request, jsonify, abort
 from InspectionHandler import InspectionHandler
 from src.utils.AASManager import AASManager
-from src.utils.util_config_cars import get_car_name, get_cars_json, update_car_data, set_car_rfid
+from src.utils.RegistrySync import registry_sync
+from src.utils.util_bulk_rfid import parse_rfid_mapping, import_rfid_mapping
+from src.utils.util_config_cars import get_car_name, get_cars_json, set_car_rfid
 
 app = Flask(__name__)
 
@@ -10,8 +12,8 @@ app = Flask(__name__)
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """
-    Serves the main page of the application, handles POST to update RFID settings,
-    and dynamically updates car data from the AAS.
+    Serves the main page of the application and handles POST to update RFID settings.
+    The car data is kept in sync with the AAS registry by the background registry sync.
     """
     context = {}
     if request.method == 'POST':
@@ -19,9 +21,8 @@ def index():
         auto_id = request.form['autoId'] if 'autoId' in request.form else None
         if rfid is not None and auto_id is not None:
             set_car_rfid(auto_id, rfid)
-    if aas_manager.test_connection_successful:
-        auto_id_list = aas_manager.get_all_idShorts()
-        update_car_data(auto_id_list)
+    # Rendered from the cached state, the registry is probed by the background sync and /check_aas_connection/
+    aas_manager.test_connection(probe=False)
     data = get_cars_json()
     context["vehicles"] = data
     context["handler_connected"] = handler.is_connected
@@ -32,9 +33,40 @@ def index():
     inspection_handler_status = "not connected" if not handler.test_connection_successful else inspection_handler_status
     context["inspection_handler_status"] = inspection_handler_status
     context["aas_connection"] = aas_manager.test_connection_successful
+    context["aas_breakers"] = aas_manager.get_breaker_states()
+    context["registry_sync"] = registry_sync.status()
+    context["inspection_queue"] = handler.opcua_subscriber.dispatcher.stats()
     return render_template("index.html", **context)
 
 
+@app.route('/bulk_rfid/', methods=['POST'])
+def bulk_rfid():
+    """
+    Assigns the RFIDs of many vehicles at once from a CSV or JSON mapping of AutoID to RFID, sent either as an
+    uploaded 'file' or as the request body. The import is validated against the AAS registry and applied in one
+    transaction; with ?dry_run=true it is only validated. Responds with a report and 409 if there are conflicts,
+    400 if the mapping can't be read and 500 if it couldn't be saved.
+    """
+    upload = request.files.get('file')
+    try:
+        if upload is not None:
+            content = upload.read().decode('utf-8-sig')
+            file_format = 'json' if (upload.filename or '').lower().endswith('.json') else 'csv'
+        else:
+            content = request.get_data().decode('utf-8-sig')
+            file_format = 'json' if request.is_json else 'csv'
+        file_format = request.args.get('format', file_format)
+        rows = parse_rfid_mapping(content, file_format)
+    except ValueError as e:
+        # Also covers undecodable uploads (UnicodeDecodeError) and malformed CSV or JSON
+        return jsonify(error=str(e)), 400
+    report = import_rfid_mapping(rows, check_registry=request.args.get('check_registry', 'true') == 'true',
+                                 dry_run=request.args.get('dry_run') == 'true')
+    if report.get("error"):
+        return jsonify(report), 500
+    return jsonify(report), 409 if report["conflicts"] else 200
+
+
 @app.route('/switch_settings/', methods=['POST'])
 def handle_switch():
     """
@@ -44,6 +76,7 @@ def handle_switch():
     is_simulation = request.form.get('is_simulation') == 'true'
     if handler.is_connected:
         stop_inspection()
+    handler.mqtt_client.disconnect()
     handler = InspectionHandler(is_simulation=is_simulation)
     return redirect(url_for('index'))
 
@@ -130,6 +163,7 @@ def inspection_response(auto_id):
         data = aas_manager.get_inspection_response(auto_id)
         if data:
             context["data"] = data['Response_Plan'] if 'Response_Plan' in data else print(json.dumps(data, indent=4))
+            context["missing_cameras"] = data.get("missing_cameras")
         else:
             context["warning"] = "No Inspection Response was found!\n Check the AAS connection!"
             aas_manager.test_connection()
@@ -184,4 +218,5 @@ def reset_logs():
 if __name__ == '__main__':
     aas_manager = AASManager(logger_on=False)
     handler = InspectionHandler(is_simulation=True)
+    registry_sync.start()
     app.run(debug=False, port=3000, host="0.0.0.0")
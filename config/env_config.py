@@ -13,7 +13,83 @@ class Settings:
         self.mqtt_url = os.getenv("MQTT_URL")
         self.mqtt_port = os.getenv("MQTT_PORT")
 
+        # Cameras of the station, each with the topics bpa24/<camera>/request and bpa24/<camera>/result
+        self.mqtt_cameras = [camera.strip() for camera in os.getenv("MQTT_CAMERAS", "cv").split(",") if camera.strip()]
+
+        # MQTT session (seconds): keepalive, bounded connection wait and reconnect backoff
+        self.mqtt_keepalive = int(os.getenv("MQTT_KEEPALIVE", 30))
+        self.mqtt_connect_timeout = float(os.getenv("MQTT_CONNECT_TIMEOUT", 5))
+        self.mqtt_reconnect_min_delay = int(os.getenv("MQTT_RECONNECT_MIN_DELAY", 1))
+        self.mqtt_reconnect_max_delay = int(os.getenv("MQTT_RECONNECT_MAX_DELAY", 30))
+
+        # Camera requests: adaptive timeout from the p99 latency and hedged re-trigger at the p95 latency (seconds)
+        self.camera_latency_min_samples = int(os.getenv("CAMERA_LATENCY_MIN_SAMPLES", 20))
+        self.camera_timeout_factor = float(os.getenv("CAMERA_TIMEOUT_FACTOR", 1.5))
+        self.camera_timeout_min = float(os.getenv("CAMERA_TIMEOUT_MIN", 0.2))
+        self.camera_timeout_max = float(os.getenv("CAMERA_TIMEOUT_MAX", 2))
+
+        # AAS registry snapshot (seconds)
+        self.aas_registry_ttl = float(os.getenv("AAS_REGISTRY_TTL", 30))
+        self.aas_registry_min_refresh = float(os.getenv("AAS_REGISTRY_MIN_REFRESH", 2))
+        self.aas_registry_page_size = int(os.getenv("AAS_REGISTRY_PAGE_SIZE", 100))
+
+        # AAS submodel identifier and attachment caches
+        self.aas_submodel_cache_size = int(os.getenv("AAS_SUBMODEL_CACHE_SIZE", 256))
+        self.aas_submodel_cache_ttl = float(os.getenv("AAS_SUBMODEL_CACHE_TTL", 3600))
+        self.aas_attachment_cache_size = int(os.getenv("AAS_ATTACHMENT_CACHE_SIZE", 256))
+
+        # AAS HTTP sessions (timeouts in seconds)
+        self.aas_pool_size = int(os.getenv("AAS_POOL_SIZE", 10))
+        self.aas_retry_total = int(os.getenv("AAS_RETRY_TOTAL", 2))
+        self.aas_retry_backoff = float(os.getenv("AAS_RETRY_BACKOFF", 0.2))
+        self.aas_connect_timeout = float(os.getenv("AAS_CONNECT_TIMEOUT", 3))
+        self.aas_read_timeout = float(os.getenv("AAS_READ_TIMEOUT", 8))
+
+        # AAS circuit breakers per host
+        self.aas_breaker_failures = int(os.getenv("AAS_BREAKER_FAILURES", 3))
+        self.aas_breaker_reset = float(os.getenv("AAS_BREAKER_RESET", 15))
+
+        # Inspection plan prefetch (seconds)
+        self.plan_prefetch_interval = float(os.getenv("PLAN_PREFETCH_INTERVAL", 60))
+
+        # Write-behind upload of inspection responses
+        self.upload_queue_size = int(os.getenv("UPLOAD_QUEUE_SIZE", 100))
+        self.upload_workers = int(os.getenv("UPLOAD_WORKERS", 2))
+        self.upload_max_retries = int(os.getenv("UPLOAD_MAX_RETRIES", 3))
+        self.upload_retry_backoff = float(os.getenv("UPLOAD_RETRY_BACKOFF", 0.5))
+
+        # Car registry (seconds between two checks of the cars_config.json modification time)
+        self.cars_config_check_interval = float(os.getenv("CARS_CONFIG_CHECK_INTERVAL", 1))
+
+        # Compiled response plans (number of cached plans, seconds between two checks of the mapping config)
+        self.response_plan_cache_size = int(os.getenv("RESPONSE_PLAN_CACHE_SIZE", 64))
+        self.response_config_check_interval = float(os.getenv("RESPONSE_CONFIG_CHECK_INTERVAL", 1))
+
+        # Camera frames per vehicle pass, their aggregation rule ("max", "majority" or "ewma") and deadline (seconds)
+        self.inspection_frames = int(os.getenv("INSPECTION_FRAMES", 1))
+        self.inspection_aggregation = os.getenv("INSPECTION_AGGREGATION", "max")
+        self.inspection_deadline = float(os.getenv("INSPECTION_DEADLINE", 2))
+        self.inspection_ewma_alpha = float(os.getenv("INSPECTION_EWMA_ALPHA", 0.5))
+
+        # Inspection workers and their queue, overload policy "reject" or "drop_oldest"
+        self.inspection_workers = int(os.getenv("INSPECTION_WORKERS", 2))
+        self.inspection_queue_size = int(os.getenv("INSPECTION_QUEUE_SIZE", 16))
+        self.inspection_overload_policy = os.getenv("INSPECTION_OVERLOAD_POLICY", "reject")
+
+        # Repeated reads of the same RFID tag within the window are suppressed (seconds, number of remembered tags)
+        self.rfid_debounce_window = float(os.getenv("RFID_DEBOUNCE_WINDOW", 5))
+        self.rfid_debounce_cache_size = int(os.getenv("RFID_DEBOUNCE_CACHE_SIZE", 256))
+
         self.config_path = os.path.dirname(os.path.abspath(__file__))
 
+        # Vehicle store: "json" (cars_config.json) or "sqlite"
+        self.vehicle_store = os.getenv("VEHICLE_STORE", "json")
+        self.vehicle_db_path = os.getenv("VEHICLE_DB_PATH", os.path.join(self.config_path, "vehicles.db"))
+
+        # Background sync of the cars configuration with the AAS registry (seconds, and the number of consecutive
+        # syncs a car must be missing from the registry before it is removed)
+        self.registry_sync_interval = float(os.getenv("REGISTRY_SYNC_INTERVAL", 30))
+        self.registry_sync_missing_syncs = int(os.getenv("REGISTRY_SYNC_MISSING_SYNCS", 3))
+
 
 settings = Settings()
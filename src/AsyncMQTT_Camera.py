@@ -0,0 +1,247 @@
+import asyncio
+import time
+import uuid
+from gmqtt import Client
+from gmqtt.mqtt.constants import MQTTv50
+
+from config.env_config import settings
+from src.MQTT_Camera import cameras
+from src.utils.LatencyHistogram import LatencyHistogram, get_adaptive_timeout, get_hedge_delay
+from src.utils.Logger import SingletonLogger
+from src.utils.util_inspection_response import merge_camera_responses
+from src.utils.util_payload import decode_payload, get_accepted_content_types
+
+broker_address = settings.mqtt_url
+port = int(settings.mqtt_port)
+
+logger = SingletonLogger()
+
+
+class AsyncMQTTClient:
+    """
+    The asyncio counterpart of `MQTTClient`. The MQTT connection runs on the event loop of the caller (via gmqtt)
+    instead of paho's network thread, and `request_response_cv` is a coroutine, so a pending camera request doesn't
+    block a thread and can be awaited together with AAS fetches, e.g. with `asyncio.gather`.
+
+    The behaviour is that of `MQTTClient`, sharing its camera configuration, payload decoding, latency rules and
+    merging of camera replies:
+
+    - Every request carries a correlation ID in the MQTT v5 'CorrelationData' property together with the
+      'ResponseTopic' and waits on its own future. Replies without a correlation ID are given to the oldest pending
+      request of their topic, replies for requests that already timed out or were cancelled are dropped and counted.
+    - Payloads are decoded by content type: MessagePack or CBOR if installed, otherwise JSON.
+    - An inspection request triggers all cameras of the station (setting `mqtt_cameras`) at once. Without an explicit
+      timeout it waits for the adaptive deadline derived from the p99 reply latency of the cameras, and a camera that
+      hasn't replied by its p95 latency is triggered once more (hedged request).
+
+    Attributes:
+        client (gmqtt.Client): The MQTT v5 client, created on the running event loop by `connect`.
+        broker_address (str): Address of the MQTT broker.
+        port (int): Port number to connect to the MQTT broker.
+        cameras (dict): Camera name to its (request topic, response topic).
+        request_topic (str): MQTT topic for publishing inspection requests to the first camera.
+        response_topic (str): MQTT topic for subscribing to receive inspection responses of the first camera.
+        is_connected (bool): True if the client is connected to the broker.
+        stale_replies (int): Number of replies that arrived after their request timed out, or without any request.
+        latency (dict): Camera name to its `LatencyHistogram` of reply latencies.
+        hedged_requests (int): Number of hedged re-triggers that were sent.
+
+    Methods:
+        connect(self):
+            Connects to the MQTT broker and subscribes to the response topics of all cameras.
+
+        send_request(self, message, camera):
+            Publishes a request message with a new correlation ID to the request topic of a camera, by default
+            the first one. Returns the correlation ID and the future of the reply.
+
+        get_adaptive_timeout(self):
+            Returns the timeout derived from the p99 reply latency of the cameras.
+
+        get_latency_stats(self):
+            Returns the sample count and p50, p95 and p99 reply latency per camera.
+
+        request_response_cv(self, message, timeout):
+            Sends a request for camera inspection to all cameras and waits for their replies within the specified
+            timeout, or the adaptive timeout if none is given. With several cameras the replies are merged, and
+            marked as 'partial' with the 'missing_cameras' if not all cameras replied in time. Returns None if no
+            reply arrived in time. Cancelling the awaiting task cancels the request.
+
+        disconnect(self):
+            Disconnects from the MQTT broker.
+
+    Usage:
+        async with AsyncMQTTClient() as mqtt_client:
+            camera_response, inspection_plan = await asyncio.gather(
+                mqtt_client.request_response_cv(), aas_manager.get_inspection_plan(auto_id))
+    """
+
+    def __init__(self, broker_address_in=broker_address, port_in=port, cameras_in=None):
+        self.client = None
+        self.broker_address = broker_address_in
+        self.port = port_in
+        self.cameras = cameras_in or cameras
+        self.request_topic, self.response_topic = next(iter(self.cameras.values()))
+        self.is_connected = False
+        self.stale_replies = 0
+        self.latency = {camera: LatencyHistogram() for camera in self.cameras}
+        self.hedged_requests = 0
+        self.accept = ", ".join(get_accepted_content_types())
+        self.pending_requests = {}
+        self._connect_lock = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    def on_connect(self, client, flags, reason_code, properties):
+        for _, camera_response_topic in self.cameras.values():
+            client.subscribe(camera_response_topic)
+        self.is_connected = True
+        logger.info(f"Connected and subscribed to MQTT-Broker on topic: {self.response_topic}")
+
+    def on_disconnect(self, client, packet, exc=None):
+        self.is_connected = False
+        if exc is not None:
+            logger.warning(f"Unexpected MQTT disconnection: {exc}")
+
+    def on_message(self, client, topic, payload, qos, properties):
+        if not any(topic == camera_response_topic for _, camera_response_topic in self.cameras.values()):
+            return 0
+        correlation_id = (properties.get("correlation_data") or [None])[0]
+        if correlation_id is None:
+            # Replies without correlation ID are answered in request order
+            correlation_id = next((pending_id for pending_id, pending in self.pending_requests.items()
+                                   if pending[0] == topic), None)
+        pending = self.pending_requests.pop(correlation_id, None)
+        if pending is None or pending[1].done():
+            self.stale_replies += 1
+            logger.warning(f"Dropped stale MQTT reply on topic {topic} ({self.stale_replies} stale replies)")
+            return 0
+        _, future, camera, sent_at = pending
+        content_type = (properties.get("content_type") or [None])[0] or next(
+            (value for key, value in properties.get("user_property", []) if key.lower() == "content-type"), None)
+        try:
+            response_payload = decode_payload(payload, content_type)
+            logger.debug("Inspection Data from MQTT on topic %s: %s", topic, response_payload)
+            # Only valid replies feed the latency percentiles that drive hedging and the timeout
+            self.latency[camera].record(time.monotonic() - sent_at)
+        except ValueError as e:
+            print(f"Error decoding {content_type or 'JSON'} from MQTT on topic {topic}: {e}")
+            response_payload = None
+        future.set_result(response_payload)
+        return 0
+
+    async def connect(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.is_connected:
+                return
+            self.client = Client(None)
+            self.client.on_connect = self.on_connect
+            self.client.on_message = self.on_message
+            self.client.on_disconnect = self.on_disconnect
+            try:
+                await self.client.connect(self.broker_address, self.port, version=MQTTv50,
+                                          keepalive=settings.mqtt_keepalive)
+            except Exception as e:
+                logger.error(f"Error connecting to MQTT-Broker: {e}")
+                self.is_connected = False
+
+    def send_request(self, message="Triggering Camera", camera=None):
+        camera = camera or next(iter(self.cameras))
+        camera_request_topic, camera_response_topic = self.cameras[camera]
+        correlation_id = uuid.uuid4().bytes
+        future = asyncio.get_running_loop().create_future()
+        self.pending_requests[correlation_id] = (camera_response_topic, future, camera, time.monotonic())
+        self.client.publish(camera_request_topic, message, correlation_data=correlation_id,
+                            response_topic=camera_response_topic, user_property=[("accept", self.accept)])
+        return correlation_id, future
+
+    def get_adaptive_timeout(self):
+        """
+        Timeout derived from the p99 reply latency of the slowest camera, see `get_adaptive_timeout` of
+        `LatencyHistogram`.
+        """
+        return get_adaptive_timeout(self.latency.values())
+
+    def get_latency_stats(self):
+        return {camera: histogram.stats() for camera, histogram in self.latency.items()}
+
+    async def request_response_cv(self, message="Triggering Camera", timeout=None):
+        if not self.is_connected:
+            await self.connect()
+            if not self.is_connected:
+                return None
+        if timeout is None:
+            timeout = self.get_adaptive_timeout()
+        responses = await self._request_cameras(message, timeout)
+        missing_cameras = [camera for camera, response in responses.items() if response is None]
+        if missing_cameras:
+            logger.warning(f"No MQTT reply from the cameras {', '.join(missing_cameras)} within {timeout} seconds")
+        if len(self.cameras) == 1:
+            return responses[next(iter(self.cameras))]
+        if len(missing_cameras) == len(responses):
+            return None
+        return merge_camera_responses(responses)
+
+    async def _request_cameras(self, message, timeout):
+        """
+        Triggers all cameras and waits for the first valid reply of each camera until the deadline. A camera that
+        hasn't replied by its p95 latency, or whose replies couldn't be decoded, is triggered a second time.
+        :return: Camera name to its response, or None if the camera didn't reply in time.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        requests = {camera: [self.send_request(message, camera)] for camera in self.cameras}
+        hedge_at = {}
+        for camera in self.cameras:
+            hedge_delay = get_hedge_delay(self.latency[camera])
+            # Without enough samples or with a p95 beyond the deadline a camera is not hedged
+            if hedge_delay is not None and started + hedge_delay < deadline:
+                hedge_at[camera] = started + hedge_delay
+        responses = dict.fromkeys(self.cameras)
+        try:
+            while True:
+                now = time.monotonic()
+                for camera in list(requests):
+                    futures = [future for _, future in requests[camera]]
+                    response = next((future.result() for future in futures
+                                     if future.done() and future.result() is not None), None)
+                    if response is not None:
+                        responses[camera] = response
+                        self._forget_requests(requests.pop(camera))
+                    elif len(futures) == 1 and now < deadline and (
+                            (camera in hedge_at and hedge_at[camera] <= now) or futures[0].done()):
+                        requests[camera].append(self.send_request(message, camera))
+                        self.hedged_requests += 1
+                if not requests or now >= deadline:
+                    break
+                next_hedge = min((hedge_at[camera] for camera in requests
+                                  if camera in hedge_at and len(requests[camera]) == 1), default=deadline)
+                pending = [future for camera_requests in requests.values() for _, future in camera_requests
+                           if not future.done()]
+                if not pending:
+                    # Every trigger was answered with an invalid reply
+                    break
+                await asyncio.wait(pending, timeout=max(0.0, min(next_hedge, deadline) - now),
+                                   return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Also on cancellation, so that late replies are counted as stale
+            for camera_requests in requests.values():
+                self._forget_requests(camera_requests)
+        return responses
+
+    def _forget_requests(self, camera_requests):
+        for correlation_id, future in camera_requests:
+            self.pending_requests.pop(correlation_id, None)
+            future.cancel()
+
+    async def disconnect(self):
+        if self.client is not None and self.is_connected:
+            await self.client.disconnect()
+            logger.info("Disconnected from MQTT server")
+        self.is_connected = False
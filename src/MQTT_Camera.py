@@ -1,15 +1,24 @@
-import json
+import time
+import uuid
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 import paho.mqtt.client as mqtt
 from paho.mqtt.client import MQTTMessage
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 import threading
 
 from config.env_config import settings
+from src.utils.LatencyHistogram import LatencyHistogram, get_adaptive_timeout, get_hedge_delay
 from src.utils.Logger import SingletonLogger
+from src.utils.util_inspection_response import merge_camera_responses
+from src.utils.util_payload import decode_payload, get_accepted_content_types
 
 broker_address = settings.mqtt_url
 port = int(settings.mqtt_port)
-request_topic = "bpa24/cv/request"
-response_topic = "bpa24/cv/result"
+cameras = {camera: (f"bpa24/{camera}/request", f"bpa24/{camera}/result") for camera in settings.mqtt_cameras}
+if not cameras:
+    raise ValueError("MQTT_CAMERAS must name at least one camera, e.g. MQTT_CAMERAS=cv or MQTT_CAMERAS=front,rear")
+request_topic, response_topic = next(iter(cameras.values()))
 
 logger = SingletonLogger()
 
@@ -23,14 +32,42 @@ class MQTTClient:
     responses from an MQTT broker, employing events to manage the synchronous aspects of asynchronous 
     communications.
 
+    Every request carries a correlation ID in the MQTT v5 'CorrelationData' property together with the
+    'ResponseTopic', and waits on its own future. Replies are routed to the request with the same correlation ID,
+    so several inspections can be in flight on one connection. Replies without a correlation ID are given to the
+    oldest pending request of their topic. Replies for requests that already timed out are dropped and counted.
+
+    The client keeps one persistent session: the connection is opened once in the background network thread, lost
+    connections are re-established automatically with exponential backoff, and the health of the session is
+    tracked from the connect/disconnect callbacks. paho's keepalive pings an idle broker and drops the connection,
+    calling on_disconnect, if the PINGRESP doesn't arrive in time, so a connected session is a live one. A
+    connection test therefore doesn't open an extra connection.
+
+    Requests advertise the payload encodings this installation can decode in an 'accept' user property
+    (MessagePack and CBOR if their packages are installed, and JSON). Replies are decoded straight from the payload
+    bytes according to their MQTT v5 'ContentType' property or 'content-type' user property, JSON is the fallback.
+
+    The reply latency of every camera is recorded in a histogram. Without an explicit timeout, a request waits for
+    an adaptive deadline derived from the p99 latency of its cameras. If a camera hasn't replied by its p95 latency,
+    the trigger is sent once more (hedged request) and the first valid reply of either trigger wins, so a dropped
+    trigger no longer stalls the inspection until the timeout.
+
+    A station can have several cameras (setting `mqtt_cameras`). An inspection request triggers all of them at
+    once and waits for their replies with one overall deadline, so the latency is that of the slowest camera.
+
     Attributes:
         client (mqtt.Client): Instance of the MQTT client using MQTT v5.0 protocol.
         broker_address (str): Address of the MQTT broker.
         port (int): Port number to connect to the MQTT broker.
-        request_topic (str): MQTT topic for publishing inspection requests.
-        response_topic (str): MQTT topic for subscribing to receive inspection responses.
+        cameras (dict): Camera name to its (request topic, response topic).
+        request_topic (str): MQTT topic for publishing inspection requests to the first camera.
+        response_topic (str): MQTT topic for subscribing to receive inspection responses of the first camera.
         response_payload (dict): Stores the latest received response payload.
+        stale_replies (int): Number of replies that arrived after their request timed out, or without any request.
+        latency (dict): Camera name to its `LatencyHistogram` of reply latencies.
+        hedged_requests (int): Number of hedged re-triggers that were sent.
         is_connected (bool): True if the client is successfully connected to the broker.
+        last_seen (float): Monotonic time of the last connect or message from the broker, or None.
         connection_established (threading.Event): An event to signal successful connection establishment.
         message_received (threading.Event): An event to signal the receipt of a new message.
 
@@ -46,22 +83,35 @@ class MQTTClient:
             Handles the disconnection event, resets connection flags, and logs the event.
 
         on_message(self, client, userdata, msg):
-            Processes received messages, decodes JSON payloads, and logs the data.
+            Processes received messages, decodes JSON, MessagePack or CBOR payloads, and logs the data at DEBUG level.
+
+        is_healthy(self):
+            Returns True if the session is connected, i.e. the broker answered the keepalive in time.
 
         test_connection(self):
-            Attempts to connect to the MQTT broker to check the connection status.
+            Checks the health of the session, starting the session if it wasn't started yet.
 
         connect(self):
-            Establishes a connection with the MQTT broker and begins the network loop.
+            Starts the persistent session in the network loop and waits for the connection with a bounded timeout.
+
+        send_request(self, message, camera):
+            Publishes a request message with a new correlation ID to the request topic of a camera, by default
+            the first one. Returns the correlation ID and the future of the reply.
 
-        send_request(self, message):
-            Publishes a request message to the specified request topic.
+        get_adaptive_timeout(self):
+            Returns the timeout derived from the p99 reply latency of the cameras.
+
+        get_latency_stats(self):
+            Returns the sample count and p50, p95 and p99 reply latency per camera.
 
         request_response_cv(self, message, timeout):
-            Sends a request for camera inspection and waits for a response within the specified timeout.
+            Sends a request for camera inspection to all cameras and waits for their replies within the specified
+            timeout, or the adaptive timeout if none is given. Cameras that are slower than their p95 latency are
+            triggered a second time. With several cameras the replies are merged, and marked as 'partial' with the
+            'missing_cameras' if not all cameras replied in time. Returns None if no reply arrived in time.
 
         disconnect(self):
-            Stops the network loop and disconnects from the MQTT broker.
+            Stops the network loop and the automatic reconnects, and disconnects from the MQTT broker.
 
     Usage:
         mqtt_client = MQTTClient()
@@ -72,25 +122,38 @@ class MQTTClient:
 
 
 
-    def __init__(self, broker_address_in=broker_address, port_in=port):
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    def __init__(self, broker_address_in=broker_address, port_in=port, cameras_in=None):
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
         self.broker_address = broker_address_in
         self.port = port_in
-        self.request_topic = request_topic
-        self.response_topic = response_topic
+        self.cameras = cameras_in or cameras
+        self.request_topic, self.response_topic = next(iter(self.cameras.values()))
         self.response_payload = None
+        self.stale_replies = 0
+        self.latency = {camera: LatencyHistogram() for camera in self.cameras}
+        self.hedged_requests = 0
+        self.accept = ", ".join(get_accepted_content_types())
+        self.pending_requests = {}
+        self.pending_lock = threading.Lock()
         self.test_connection_successful = False
         self.is_connected = False
+        self.last_seen = None
+        self.session_started = False
         self.connection_established = threading.Event()
         self.message_received = threading.Event()
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
         self.client.on_disconnect = self.on_disconnect
+        self.client.reconnect_delay_set(settings.mqtt_reconnect_min_delay, settings.mqtt_reconnect_max_delay)
 
     def on_connect(self, client, userdata, flags, reason_code, properties=None):
         if reason_code == 0:
-            client.subscribe(self.response_topic)
+            client.subscribe([(camera_response_topic, 0) for _, camera_response_topic in self.cameras.values()])
+            self.is_connected = True
+            self.test_connection_successful = True
+            self.last_seen = time.monotonic()
             self.connection_established.set()
+            logger.info(f"Connected and subscribed to MQTT-Broker on topic: {self.response_topic}")
         else:
             self.is_connected = False
             logger.warning(f"MQTT connection failed on topic {self.response_topic} with reason code {reason_code}")
@@ -103,52 +166,164 @@ class MQTTClient:
         self.connection_established.clear()
 
     def on_message(self, client, userdata, msg: MQTTMessage):
-        if msg.topic == self.response_topic:
+        self.last_seen = time.monotonic()
+        if any(msg.topic == camera_response_topic for _, camera_response_topic in self.cameras.values()):
+            correlation_id = getattr(msg.properties, "CorrelationData", None) if msg.properties else None
+            with self.pending_lock:
+                if correlation_id is not None:
+                    pending = self.pending_requests.pop(correlation_id, None)
+                else:
+                    # Replies without correlation ID are answered in request order
+                    correlation_id = next((pending_id for pending_id, pending in self.pending_requests.items()
+                                           if pending[0] == msg.topic), None)
+                    pending = self.pending_requests.pop(correlation_id, None)
+                if pending is None:
+                    self.stale_replies += 1
+            if pending is None:
+                logger.warning(f"Dropped stale MQTT reply on topic {msg.topic} ({self.stale_replies} stale replies)")
+                return
+            camera_response_topic, future, camera, sent_at = pending
+            content_type = self._get_content_type(msg.properties)
             try:
-                self.response_payload = json.loads(msg.payload.decode())
-                logger.info(f"Inspection Data from MQTT: {self.response_payload}")
-            except json.JSONDecodeError:
-                print(f"Error decoding JSON from MQTT on topic {self.response_topic}")
+                self.response_payload = decode_payload(msg.payload, content_type)
+                logger.debug("Inspection Data from MQTT on topic %s: %s", msg.topic, self.response_payload)
+                # Only valid replies feed the latency percentiles that drive hedging and the timeout
+                self.latency[camera].record(time.monotonic() - sent_at)
+            except ValueError as e:
+                print(f"Error decoding {content_type or 'JSON'} from MQTT on topic {msg.topic}: {e}")
+                self.response_payload = None
+            future.set_result(self.response_payload)
             self.message_received.set()
 
+    @staticmethod
+    def _get_content_type(properties):
+        if properties is None:
+            return None
+        content_type = getattr(properties, "ContentType", None)
+        if content_type:
+            return content_type
+        return next((value for key, value in getattr(properties, "UserProperty", [])
+                     if key.lower() == "content-type"), None)
+
+    def is_healthy(self):
+        # paho disconnects the session if the broker doesn't answer a keepalive PINGREQ in time
+        return self.connection_established.is_set()
+
     def test_connection(self):
-        if not self.is_connected:
-            try:
-                self.client.connect(self.broker_address, self.port)
-                self.test_connection_successful = True
-                self.client.disconnect()
-            except Exception as e:
-                logger.error("Error connecting to MQTT-Broker")
-                self.is_connected = False
-                self.test_connection_successful = False
+        if not self.session_started:
+            self.connect()
+        self.test_connection_successful = self.is_healthy()
 
     def connect(self):
-        if not self.is_connected:
-            self.test_connection()
-            if self.test_connection_successful:
-                self.client.connect(self.broker_address, self.port)
-                self.is_connected = True
-                logger.info(f"Connected and subscribed to MQTT-Broker on topic: {self.response_topic}")
+        if not self.session_started:
+            try:
+                self.client.connect_async(self.broker_address, self.port, keepalive=settings.mqtt_keepalive)
                 self.client.loop_start()
-                self.connection_established.wait()
-            else:
+                self.session_started = True
+            except Exception as e:
+                logger.error(f"Error connecting to MQTT-Broker: {e}")
                 self.is_connected = False
+                self.test_connection_successful = False
+                return
+        if not self.connection_established.wait(settings.mqtt_connect_timeout):
+            logger.error(f"No connection to MQTT-Broker within {settings.mqtt_connect_timeout} seconds")
+            self.is_connected = False
 
-    def send_request(self, message="Triggering Camera"):
-        self.client.publish(self.request_topic, message)
+    def send_request(self, message="Triggering Camera", camera=None):
+        camera = camera or next(iter(self.cameras))
+        camera_request_topic, camera_response_topic = self.cameras[camera]
+        correlation_id = uuid.uuid4().bytes
+        future = Future()
+        with self.pending_lock:
+            self.pending_requests[correlation_id] = (camera_response_topic, future, camera, time.monotonic())
+        properties = Properties(PacketTypes.PUBLISH)
+        properties.CorrelationData = correlation_id
+        properties.ResponseTopic = camera_response_topic
+        properties.UserProperty = ("accept", self.accept)
         self.message_received.clear()
+        self.client.publish(camera_request_topic, message, properties=properties)
+        return correlation_id, future
 
-    def request_response_cv(self, message="Triggering Camera", timeout=10):
+    def get_adaptive_timeout(self):
+        """
+        Timeout derived from the p99 reply latency of the slowest camera, see `get_adaptive_timeout` of
+        `LatencyHistogram`.
+        """
+        return get_adaptive_timeout(self.latency.values())
+
+    def get_latency_stats(self):
+        return {camera: histogram.stats() for camera, histogram in self.latency.items()}
+
+    def request_response_cv(self, message="Triggering Camera", timeout=None):
         if not self.is_connected or not self.connection_established.is_set():
             self.connect()
-        self.send_request(message)
-        self.message_received.wait(timeout)
-        return self.response_payload
+        if timeout is None:
+            timeout = self.get_adaptive_timeout()
+        responses = self._request_cameras(message, timeout)
+        missing_cameras = [camera for camera, response in responses.items() if response is None]
+        if missing_cameras:
+            logger.warning(f"No MQTT reply from the cameras {', '.join(missing_cameras)} within {timeout} seconds")
+        if len(self.cameras) == 1:
+            return responses[next(iter(self.cameras))]
+        if len(missing_cameras) == len(responses):
+            return None
+        return merge_camera_responses(responses)
+
+    def _request_cameras(self, message, timeout):
+        """
+        Triggers all cameras and waits for the first valid reply of each camera until the deadline. A camera that
+        hasn't replied by its p95 latency, or whose replies couldn't be decoded, is triggered a second time.
+        :return: Camera name to its response, or None if the camera didn't reply in time.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        requests = {camera: [self.send_request(message, camera)] for camera in self.cameras}
+        hedge_at = {}
+        for camera in self.cameras:
+            hedge_delay = get_hedge_delay(self.latency[camera])
+            # Without enough samples or with a p95 beyond the deadline a camera is not hedged
+            if hedge_delay is not None and started + hedge_delay < deadline:
+                hedge_at[camera] = started + hedge_delay
+        responses = dict.fromkeys(self.cameras)
+        while True:
+            now = time.monotonic()
+            for camera in list(requests):
+                futures = [future for _, future in requests[camera]]
+                response = next((future.result() for future in futures
+                                 if future.done() and future.result() is not None), None)
+                if response is not None:
+                    responses[camera] = response
+                    self._forget_requests(requests.pop(camera))
+                elif len(futures) == 1 and now < deadline and (
+                        (camera in hedge_at and hedge_at[camera] <= now) or futures[0].done()):
+                    requests[camera].append(self.send_request(message, camera))
+                    with self.pending_lock:
+                        self.hedged_requests += 1
+            if not requests or now >= deadline:
+                break
+            next_hedge = min((hedge_at[camera] for camera in requests
+                              if camera in hedge_at and len(requests[camera]) == 1), default=deadline)
+            pending = [future for camera_requests in requests.values() for _, future in camera_requests
+                       if not future.done()]
+            if not pending:
+                # Every trigger was answered with an invalid reply
+                break
+            wait(pending, timeout=max(0.0, min(next_hedge, deadline) - now), return_when=FIRST_COMPLETED)
+        for camera_requests in requests.values():
+            self._forget_requests(camera_requests)
+        return responses
+
+    def _forget_requests(self, camera_requests):
+        with self.pending_lock:
+            for correlation_id, _ in camera_requests:
+                self.pending_requests.pop(correlation_id, None)
 
     def disconnect(self):
 
-        if self.is_connected:
-            self.client.loop_stop()
+        if self.session_started:
             self.client.disconnect()
+            self.client.loop_stop()
+            self.session_started = False
             self.is_connected = False
+            self.connection_established.clear()
             logger.info("Disconnected from MQTT server")
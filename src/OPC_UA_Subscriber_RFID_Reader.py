@@ -6,6 +6,10 @@ from opcua import Client
 
 from config.env_config import settings
 from src.utils.AASManager import AASManager
+from src.utils.InspectionDispatcher import InspectionDispatcher
+from src.utils.InspectionPlanCache import inspection_plan_cache
+from src.utils.ResponseUploader import ResponseUploader
+from src.utils.RFIDDebouncer import RFIDDebouncer
 from src.utils.Logger import SingletonLogger
 from src.utils.util_config_cars import get_auto_id
 
@@ -30,6 +34,11 @@ class OPC_UA_Subscriber:
         is_connected (bool): True if the subscriber is currently connected to the server.
         opcua_url (str): The URL to the OPC UA server, determined based on the mode of operation.
         ass_manager (AASManager): An instance of the Asset Administration Shell Manager for handling data.
+        plan_cache (InspectionPlanCache): Warm cache of the inspection plans, prefetched while connected.
+        response_uploader (ResponseUploader): Write-behind uploader that puts the inspection responses into the AAS.
+        dispatcher (InspectionDispatcher): Bounded worker pool that fetches the inspection plans of the RFID reads
+            concurrently and runs their inspections one at a time in the order of the reads.
+        debouncer (RFIDDebouncer): Suppresses repeated reads of the same RFID tag within the debounce window.
         latest_auto_id_lock (threading.Lock): A lock for thread-safe operations on the latest_auto_id.
         latest_auto_id (str): The last read auto ID from the OPC UA server.
         client (Client): An OPC UA client connected to the server.
@@ -40,13 +49,16 @@ class OPC_UA_Subscriber:
 
     Methods:
         __init__(is_simulation=True): Initializes the subscriber, sets up the URL, and connects to the server.
+        get_inspection_plan(auto_id): Returns the inspection plan from the plan cache or, on a miss, from the AAS.
         test_connection(timeout=4): Tests the connection to the OPC UA server with a specified timeout.
         connect(): Establishes a connection with the OPC UA server and subscribes to node changes.
         disconnect(): Disconnects from the OPC UA server and cleans up resources.
 
     Inner Class:
-        SubHandler: Handles data change notifications from the OPC UA server, processes RFID data,
-        triggers callbacks, and logs responses based on the inspection plan retrieved using the latest auto ID.
+        SubHandler: Handles data change notifications from the OPC UA server. The notification only parses the RFID
+        tag and, unless it is a repeated read suppressed by the debouncer, enqueues it in the dispatcher; a worker then
+        retrieves the inspection plan using the auto ID, triggers the callback with it and enqueues the response for the
+        write-behind upload.
     """
 
 
@@ -59,11 +71,17 @@ class OPC_UA_Subscriber:
         else:
             self.opcua_url = OPCUA_URL
         self.ass_manager = AASManager()
+        self.plan_cache = inspection_plan_cache
+        self.response_uploader = ResponseUploader(self.ass_manager)
         self.latest_auto_id_lock = threading.Lock()
         self.latest_auto_id = None
         self.client = Client(self.opcua_url)
         self.sub = None
         self.handler = self.SubHandler(self)
+        self.debouncer = RFIDDebouncer()
+        # A tag whose read wasn't inspected is forgotten, so that its next read is accepted and retried
+        self.dispatcher = InspectionDispatcher(self.handler.prepare_inspection, self.handler.run_inspection,
+                                               on_drop=self.debouncer.forget)
 
         parsed_url = urlparse(self.opcua_url)
         self.hostname = parsed_url.hostname
@@ -75,37 +93,71 @@ class OPC_UA_Subscriber:
             self.callback = None
 
         def datachange_notification(self, node, val, data):
+            if val and val != "None":
+                element_list = val.split("\n")
+                if len(element_list) >= 2:
+                    element = element_list[0]
+                else:
+                    element = val
+                match = re.search(r'ANT.*', element)
+                if match:
+                    rfid_name = match.group()
+                    if not self.outer.debouncer.accept(rfid_name):
+                        logger.debug("Suppressed repeated RFID: %s", rfid_name)
+                        return
+                    logger.info(f"RFID: {rfid_name}")
+                    self.outer.dispatcher.submit(rfid_name)
+                    return
+            logger.error(f"RFID: {str(val)}")
             with self.outer.latest_auto_id_lock:
-                if val and val != "None":
-                    element_list = val.split("\n")
-                    if len(element_list) >= 2:
-                        element = element_list[0]
-                    else:
-                        element = val
-                    match = re.search(r'ANT.*', element)
-                    if match:
-                        rfid_name = match.group()
-                        logger.info(f"RFID: {rfid_name}")
-                        self.outer.latest_auto_id = get_auto_id(rfid_name)
-                        inspection_plan = self.outer.ass_manager.get_inspection_plan(auto_id=self.outer.latest_auto_id)
-                        if inspection_plan:
-                            if self.callback:
-                                inspection_response = self.callback(inspection_plan)
-                                self.outer.ass_manager.put_inspection_response(self.outer.latest_auto_id,
-                                                                               inspection_response)
-                            else:
-                                logger.warning("No callback function defined for OPC UA Subscriber.")
-
+                self.outer.latest_auto_id = "None"
+
+        def prepare_inspection(self, rfid_name):
+            """
+            Looks up the auto ID and the inspection plan of an RFID read. Runs concurrently on the dispatcher workers.
+            :return: The auto ID and its inspection plan.
+            """
+            auto_id = get_auto_id(rfid_name)
+            return auto_id, self.outer.get_inspection_plan(auto_id)
+
+        def run_inspection(self, rfid_name, prepared):
+            """
+            Triggers the callback with the inspection plan and enqueues the response for the upload. The dispatcher
+            runs this for one RFID read at a time and in the order of the reads, as the station has one camera. If
+            the vehicle couldn't be inspected because of a transient failure (no camera reply, AAS unavailable), the
+            tag is forgotten by the debouncer so that its next read is retried. A vehicle without an inspection plan
+            in the AAS stays debounced, so its republished reads don't fetch the plan again.
+            """
+            auto_id, inspection_plan = prepared
+            with self.outer.latest_auto_id_lock:
+                self.outer.latest_auto_id = auto_id
+            if inspection_plan:
+                if self.callback:
+                    inspection_response = self.callback(inspection_plan)
+                    if inspection_response is not None:
+                        self.outer.response_uploader.submit(auto_id, inspection_response)
                     else:
-                        logger.error(f"RFID: {str(val)}")
-                        self.outer.latest_auto_id = "None"
+                        logger.warning(f"No inspection response for {auto_id}, nothing is put into the AAS")
+                        self.outer.debouncer.forget(rfid_name)
                 else:
-                    logger.error(f"RFID: {str(val)}")
-                    self.outer.latest_auto_id = "None"
+                    logger.warning("No callback function defined for OPC UA Subscriber.")
+            elif auto_id is not None and self.outer.ass_manager.is_aas_unavailable(auto_id):
+                self.outer.debouncer.forget(rfid_name)
 
         def register_callback(self, callback):
             self.callback = callback
 
+    def get_inspection_plan(self, auto_id):
+        """
+        Returns the inspection plan from the warm plan cache, fetching it from the AAS only on a cache miss.
+        """
+        inspection_plan = self.plan_cache.get(auto_id)
+        if inspection_plan is None:
+            inspection_plan = self.ass_manager.get_inspection_plan(auto_id=auto_id)
+            if inspection_plan:
+                self.plan_cache.put(auto_id, inspection_plan)
+        return inspection_plan
+
     def test_connection(self, timeout=4):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(timeout)  # Timeout für die Verbindung einstellen
@@ -141,6 +193,9 @@ class OPC_UA_Subscriber:
                         auto_id_node = objects.get_child(node_path)
                     self.sub = self.client.create_subscription(100, self.handler)
                     self.sub.subscribe_data_change(auto_id_node)
+                    self.plan_cache.start()
+                    self.response_uploader.start()
+                    self.dispatcher.start()
                 except Exception as e:
                     self.is_connected = False
                     logger.exception(f"Unhandled exception occurred while connecting to OPC UA server!")
@@ -149,6 +204,9 @@ class OPC_UA_Subscriber:
 
     def disconnect(self):
         self.is_connected = False
+        self.plan_cache.stop()
+        self.dispatcher.stop()
+        self.response_uploader.stop()
         if self.client and self.test_connection_successful:
             self.client.disconnect()
             logger.info("Disconnected from OPC UA Server")
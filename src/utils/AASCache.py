@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+from config.env_config import settings
+
+
+class SubmodelIdentifierCache:
+    """
+    SubmodelIdentifierCache Class
+
+    The `SubmodelIdentifierCache` class caches the base64 encoded submodel identifiers of the AAS servers per
+    (host, idShort), so that the submodel list does not have to be requested for every plan read or response write.
+
+    Attributes:
+        max_size (int): Maximum number of cached identifiers, the least recently used entry is evicted first.
+        ttl (float): Time in seconds after which a cached identifier is resolved again.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were not in the cache.
+
+    Methods:
+        get(self, host, id_short):
+            Returns the cached identifier or None.
+
+        put(self, host, id_short, identifier):
+            Stores an identifier and evicts the least recently used entry if the cache is full.
+
+        invalidate(self, host, id_short=None):
+            Removes the identifier of one submodel or of all submodels of a host.
+
+        invalidate_identifier(self, host, identifier):
+            Removes a cached identifier by its value, e.g. after the AAS server answered with 404.
+
+    Usage:
+        cache = SubmodelIdentifierCache()
+        cache.put("192.168.0.10:8081", "Inspection_Plan", "dXJuOnBsYW4=")
+        identifier = cache.get("192.168.0.10:8081", "Inspection_Plan")
+    """
+
+    def __init__(self, max_size=settings.aas_submodel_cache_size, ttl=settings.aas_submodel_cache_ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host, id_short):
+        key = (host, id_short)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, host, id_short, identifier):
+        key = (host, id_short)
+        with self._lock:
+            self._entries[key] = (identifier, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, host, id_short=None):
+        with self._lock:
+            if id_short is not None:
+                self._entries.pop((host, id_short), None)
+            else:
+                for key in [key for key in self._entries if key[0] == host]:
+                    del self._entries[key]
+
+    def invalidate_identifier(self, host, identifier):
+        """
+        Removes a cached identifier by its value.
+        :param host: IP and port of the AAS server.
+        :param identifier: The base64 encoded submodel identifier.
+        :return: True if an entry was removed, otherwise False.
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if key[0] == host and entry[0] == identifier]
+            for key in keys:
+                del self._entries[key]
+            return bool(keys)
+
+
+class AttachmentCache:
+    """
+    AttachmentCache Class
+
+    The `AttachmentCache` class stores the parsed AAS attachments together with their ETag / Last-Modified
+    validators, so that attachments can be requested conditionally and a 304 response is answered with the
+    cached object instead of downloading and parsing the JSON again.
+
+    Attributes:
+        max_size (int): Maximum number of cached attachments, the least recently used entry is evicted first.
+        revalidated (int): Number of 304 responses answered from the cache.
+
+    Methods:
+        conditional_headers(self, url):
+            Returns the If-None-Match / If-Modified-Since headers for a cached attachment.
+
+        get(self, url):
+            Returns the cached parsed attachment or None.
+
+        store(self, url, headers, attachment):
+            Stores a parsed attachment if the response carried a validator.
+
+        invalidate(self, url):
+            Removes a cached attachment, e.g. after it was replaced by a PUT.
+
+    Usage:
+        headers = attachment_cache.conditional_headers(url)
+        response = session.get(url, headers=headers)
+        attachment = attachment_cache.get(url) if response.status_code == 304 else response.json()
+    """
+
+    def __init__(self, max_size=settings.aas_attachment_cache_size):
+        self.max_size = max_size
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        if entry is not None:
+            if entry[0]:
+                headers["If-None-Match"] = entry[0]
+            if entry[1]:
+                headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+            self.revalidated += 1
+            return entry[2]
+
+    def store(self, url, headers, attachment):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(url, None)
+                return
+            self._entries[url] = (etag, last_modified, attachment)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        with self._lock:
+            self._entries.pop(url, None)
+
+
+submodel_identifier_cache = SubmodelIdentifierCache()
+attachment_cache = AttachmentCache()
@@ -1,12 +1,34 @@
-import json
-import requests
+import asyncio
+import concurrent.futures
+import threading
+from urllib.parse import urlparse
 from config.env_config import settings
-from src.utils.util_aas import encode_to_base64
-from requests_toolbelt.multipart.encoder import MultipartEncoder
+from src.utils.AASRegistry import get_registry
+from src.utils.AsyncAASManager import AsyncAASManager
+from src.utils.CircuitBreaker import CLOSED, OPEN, aas_circuit_breakers
 from src.utils.Logger import SingletonLogger
 
 logger = SingletonLogger()
 
+# Upper bound of the requests of one lookup: submodel metadata (2), attachment and its revalidation (2), the check
+# for an outdated submodel identifier (1) and the lookup with the new identifier (4)
+LOOKUP_REQUESTS = 9
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+def _get_event_loop():
+    """
+    Returns the event loop the `AsyncAASManager` of every `AASManager` runs on, starting its thread on first use.
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+        return _event_loop
+
 
 class AASManager:
     """
@@ -14,14 +36,32 @@ class AASManager:
 
     The `AASManager` class handles communication with the Asset Administration Shell (AAS) registry to manage inspection plans and responses.
 
+    It is a thin synchronous wrapper over `AsyncAASManager`: every call is run as a coroutine on one shared
+    background event loop and waited for, so there is a single implementation of the AAS requests and the callers
+    of all threads share its keep-alive connections and single-flight lookups. The wait is bounded by the HTTP
+    timeouts of the requests a call can make; a call that takes longer is cancelled and fails like an AAS error.
+
     Attributes:
         AAS_Registry_URL (str): URL of the AAS registry.
         ID (str): Key to identify the asset in the AAS.
+        registry (AASRegistry): Shared, TTL-cached snapshot of the AAS registry indexed by idShort.
+        breakers (CircuitBreakerRegistry): Circuit breakers per AAS host.
+        async_manager (AsyncAASManager): The asynchronous client the calls are delegated to.
 
     Methods:
         __init__(self):
             Initializes the AASManager and logs the initialization.
 
+        test_connection(self, probe=True):
+            Updates test_connection_successful from the circuit breaker of the registry host and the last registry
+            refresh, probing the registry first if probe is True.
+
+        get_breaker_states(self):
+            Returns the circuit breaker state of every AAS host that was contacted.
+
+        is_aas_unavailable(self, auto_id):
+            Returns True if the AAS hosts of an auto_id are failing, i.e. a missing inspection plan may be transient.
+
         get_inspection_plan(self, auto_id):
             Retrieves the inspection plan for a given auto_id.
             :param auto_id: The ID of the auto for which to fetch the inspection plan.
@@ -36,35 +76,19 @@ class AASManager:
             Submits the inspection response (in JSON format) for a given auto_id.
             :param auto_id: The ID of the auto for which to submit the inspection response.
             :param json_dict: The inspection response data in JSON format.
-            :return: None.
-
-        _get_asset_href(self, data, id_short):
-            Finds the asset href in the provided data by the short identifier.
-            :param data: JSON data from which to find the href.
-            :param id_short: The short identifier for the asset.
-            :return: The href if found, otherwise None.
-
-        _get_submodelIdentifier(self, aas_ip_port, idShort):
-            Fetches the submodel identifier for a given AAS.
-            :param aas_ip_port: IP and port for AAS.
-            :param idShort: Short identifier for the submodel.
-            :return: Submodel identifier or None.
-
-        _get_attachment(self, ip_port, submodelIdentifier, idShortPath):
-            Fetches the attachment (inspection plan) for a given submodel identifier and path.
-            :param ip_port: IP and port for AAS.
-            :param submodelIdentifier: Identifier for the submodel.
-            :param idShortPath: Path for the submodel element.
-            :return: Inspection plan if found, otherwise None.
-
-        _put_attachment(self, ip_address, submodelIdentifier, idShortPath, ass_file_name, json_data):
-            Submits an attachment (inspection response) for a given submodel identifier and path.
-            :param ip_address: IP address for AAS.
-            :param submodelIdentifier: Identifier for the submodel.
-            :param idShortPath: Path for the submodel element.
-            :param ass_file_name: File name for the attachment.
-            :param json_data: JSON data for the attachment.
-            :return: None.
+            :return: True if the response was put into the AAS, otherwise False.
+
+        get_inspection_plans(self, auto_ids):
+            Retrieves the inspection plans of several auto_ids concurrently.
+            :param auto_ids: The IDs of the autos for which to fetch the inspection plans.
+            :return: A dictionary of auto_id to inspection plan.
+
+        get_all_idShorts(self):
+            Returns all idShorts of the registry snapshot.
+            :return: A list of all idShorts.
+
+        iter_idShorts(self):
+            Enumerates all idShorts of the registry page by page as a generator.
 
     Usage:
         aas_manager = AASManager()
@@ -77,179 +101,122 @@ class AASManager:
         self.logger_on = logger_on
         self.test_connection_successful = False
         self.AAS_Registry_URL = settings.aas_url
+        self.registry = get_registry(self.AAS_Registry_URL)
+        self.breakers = aas_circuit_breakers
+        self.async_manager = AsyncAASManager(logger_on=logger_on)
         info_temp = "Initializing AAS Manager"
         logger.info(info_temp) if self.logger_on else print(info_temp)
         self.test_connection()
 
-    def test_connection(self):
+    def _get_call_timeout(self):
+        """
+        Upper bound in seconds for one call on the background loop: up to two registry refreshes of all pages (stale
+        snapshot and lookup miss) and the requests of a lookup, each with its retries, connect and read timeout.
+        """
+        request_timeout = (settings.aas_retry_total + 1) * (settings.aas_connect_timeout + settings.aas_read_timeout)
+        pages = len(self.registry.index) // settings.aas_registry_page_size + 1
+        return request_timeout * (2 * pages + LOOKUP_REQUESTS)
+
+    def _run(self, coroutine, default=None):
+        """
+        Runs a coroutine on the shared background loop and waits for its result, at most `_get_call_timeout()`
+        seconds, so that a stalled loop or a hanging request can't block the calling thread forever.
+        :param default: Returned if the call timed out, like the result of a failed call.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, _get_event_loop())
+        timeout = self._get_call_timeout()
         try:
-            response = requests.get(self.AAS_Registry_URL, timeout=6)
-            if response.status_code == 200:
-                self.test_connection_successful = True
-            else:
-                info_temp = "The connection to the AAS Registry failed"
-                logger.error(info_temp) if self.logger_on else print(info_temp)
-                self.test_connection_successful = False
-        except Exception as e:
-            info_temp = "The connection to the AAS Registry failed due to a timeout error"
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error(f"AAS call didn't finish within {timeout} seconds and was cancelled")
+            return default
+
+    def test_connection(self, probe=True):
+        """
+        Updates test_connection_successful from the circuit breaker of the registry host and the last refresh of the
+        shared registry snapshot, which the background registry sync keeps up to date. If probe is True, the registry
+        is refreshed first whenever the breaker lets a request through and the last refresh or the last request to
+        the host failed. A probe only succeeds if the registry could be read, a 4xx reply doesn't count.
+        :param probe: False to only read the cached state, e.g. while rendering a page.
+        """
+        breaker = self.breakers.get(urlparse(self.AAS_Registry_URL).netloc)
+        if probe and (not self.registry.last_refresh_ok or breaker.last_ok is not True) and breaker.can_request():
+            self.registry.refresh()
+        if self.registry.last_refresh_ok and breaker.state != OPEN and breaker.last_ok:
+            self.test_connection_successful = True
+        else:
+            info_temp = f"The connection to the AAS Registry failed (circuit breaker {breaker.state})"
             logger.error(info_temp) if self.logger_on else print(info_temp)
             self.test_connection_successful = False
 
+    def get_breaker_states(self):
+        """
+        Returns the circuit breaker state of every AAS host that was contacted.
+        :return: A list of dictionaries with host, state, failures and last_ok.
+        """
+        return self.breakers.states()
+
+    def is_aas_unavailable(self, auto_id):
+        """
+        Tells a transient failure from a definitive miss after a lookup for auto_id returned nothing: the AAS is
+        unavailable if the last registry refresh failed, or if the circuit breaker of the registry host or of the
+        auto_id's shell host isn't closed or its last request failed (timeout, connection error or 5xx).
+        :param auto_id: The ID of the auto whose lookup returned nothing.
+        :return: True if the lookup may succeed on a retry, False if the AAS answered that there is nothing.
+        """
+        if self.registry.last_refresh_ok is False:
+            return True
+        hosts = [urlparse(self.AAS_Registry_URL).netloc]
+        href = self.registry.index.get(auto_id)
+        if href:
+            hosts.append(href.split("/")[2])
+        return any(breaker.state != CLOSED or breaker.last_ok is False for breaker in map(self.breakers.get, hosts))
+
     def get_inspection_plan(self, auto_id):
         """
-        Get inspection plan by auto_id.
+        Get inspection plan by auto_id. Concurrent calls for the same auto_id share one fetch.
         :param auto_id: The ID of the auto for which to fetch the inspection plan.
-        :return: The inspection plan or the auto_id if an error occurs.
+        :return: The inspection plan or None if an error occurs.
         """
-        try:
-            response = requests.get(self.AAS_Registry_URL, timeout=8)
-            if response.status_code == 200:
-                asset_href = self._find_idShort_href(response.json(), auto_id)
-                if asset_href:
-                    ip = asset_href.split("/")[2]
-                    info_temp = f"IP found in AAS Shell: {ip} for Auto ID: {auto_id}"
-                    logger.info(info_temp) if self.logger_on else print(info_temp)
-                    submodelIdentifier = self._get_submodelIdentifier(ip, "Inspection_Plan")
-                    inspection_plan = self._get_attachment(ip, submodelIdentifier, "Inspection_Plan")
-                    return inspection_plan
-        except Exception as e:
-            info_temp = f"Failed to get inspection plan from AAS Shell for {auto_id}: {e}"
-            logger.error(info_temp) if self.logger_on else print(info_temp)
-        return None
+        return self._run(self.async_manager.get_inspection_plan(auto_id))
 
     def get_inspection_response(self, auto_id):
         """
-        Get inspection response by auto_id.
+        Get inspection response by auto_id. Concurrent calls for the same auto_id share one fetch.
         :param auto_id:
         :return:
         """
-        try:
-            response = requests.get(self.AAS_Registry_URL)
-            if response.status_code == 200:
-                asset_href = self._find_idShort_href(response.json(), auto_id)
-                if asset_href:
-                    ip = asset_href.split("/")[2]
-                    info_temp = f"IP found in AAS Shell: {ip} for Auto ID: {auto_id}"
-                    logger.info(info_temp) if self.logger_on else print(info_temp)
-                    submodelIdentifier = self._get_submodelIdentifier(ip, "Response_Plan")
-                    inspection_plan = self._get_attachment(ip, submodelIdentifier, "Response_Placeholder")
-                    return inspection_plan
-        except Exception as e:
-            info_temp = f"Failed to get inspection response from AAS Shell for {auto_id}: {e}"
-            logger.error(info_temp) if self.logger_on else print(info_temp)
-        return None
+        return self._run(self.async_manager.get_inspection_response(auto_id))
 
     def put_inspection_response(self, auto_id, json_dict):
         """
         Put inspection response (JSON) by auto_id .
         :param auto_id:
         :param json_dict:
-        :return:
+        :return: True if the response was put into the AAS, otherwise False.
         """
-        try:
-            response = requests.get(self.AAS_Registry_URL)
-            if response.status_code == 200:
-                asset_href = self._find_idShort_href(response.json(), auto_id)
-                if asset_href:
-                    ip = asset_href.split("/")[2]
-                    logger.info(f"IP found in AAS Shell: {ip} for Auto ID: {auto_id}")
-                    submodelIdentifier = self._get_submodelIdentifier(ip, "Response_Plan")
-                    self._put_attachment(ip, submodelIdentifier, auto_id, "Response_Placeholder",
-                                         "InspectionResponse.json", json_dict)
-
-        except Exception as e:
-            logger.error(e)
-        return None
-
-    import requests
+        return self._run(self.async_manager.put_inspection_response(auto_id, json_dict), default=False)
+
+    def get_inspection_plans(self, auto_ids):
+        """
+        Get the inspection plans of several auto_ids concurrently on the shared event loop.
+        :param auto_ids: The IDs of the autos for which to fetch the inspection plans.
+        :return: A dictionary of auto_id to inspection plan (None if an error occurred).
+        """
+        auto_ids = list(auto_ids)
+        return self._run(self.async_manager.get_inspection_plans(auto_ids), default=dict.fromkeys(auto_ids))
 
     def get_all_idShorts(self):
         """
-        Extracts all 'idShort' values from the JSON data under the 'result' key.
+        Extracts all 'idShort' values from the registry snapshot.
         :return: A list of all 'idShort' values.
         """
-        idShort_list = []
-        try:
-            response = requests.get(self.AAS_Registry_URL)
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('result', [])
-
-                for item in results:
-                    if 'idShort' in item:
-                        idShort_list.append(item['idShort'])
-
-        except requests.RequestException as e:
-            print(f"Failed to retrieve data: {e}")
-
-        return idShort_list
-
-    def _find_idShort_href(self, data, search_idShort):
-        """
-        Retrieves the 'href' of the first endpoint for a specific 'idShort' from the provided JSON data.
-        :param data: JSON data to search through.
-        :param search_idShort: The 'idShort' value to search for.
-        :return: The 'href' string if found, otherwise None.
-        """
-        results = data.get('result', [])
-        for item in results:
-            if item.get('idShort') == search_idShort:
-                endpoints = item.get("endpoints")
-                if endpoints:
-                    return endpoints[0].get("protocolInformation", {}).get("href")
-        return None 
-
-    def _get_submodelIdentifier(self, aas_ip_port, idShort):
-        """
-        Fetch the submodel identifier.
-        :param aas_ip_port: IP and port for AAS.
-        :return: Submodel identifier or None.
-        """
-        url = f"http://{aas_ip_port}/submodels?encodedCursor=string&decodedCursor=string&level=deep&extent=withoutBlobValue"
-        response = requests.get(url)
-        submodels = response.json()
-        for model in submodels["result"]:
-            if model["idShort"] == str(idShort):
-                id_base64 = encode_to_base64(model["id"])
-                info_temp = f"Submodel Identifier: {id_base64}"
-                logger.info(info_temp) if self.logger_on else print(info_temp)
-                return id_base64
-        logger.warning(f"No submodel identifier found for AAS: {aas_ip_port}")
-        return None
-
-    def _get_attachment(self, ip_port, submodelIdentifier, idShortPath):
-        """
-        Fetch the inspection plan.
-        :param ip_port: IP and port for AAS.
-        :param submodelIdentifier: Identifier for the submodel.
-        :return: Inspection plan if found, otherwise a string indicating no plan was found.
-        """
-        url = f"http://{ip_port}/submodels/{submodelIdentifier}/submodel-elements/{idShortPath}/attachment"
-        submodel_name = idShortPath.replace("_", " ")
-        response = requests.get(url)
-        if response.status_code == 200:
-            inspection_attachment = response.json()
-            info_temp = f"{submodel_name}: {inspection_attachment}"
-            logger.info(info_temp) if self.logger_on else None
-            return inspection_attachment
-        else:
-            info_temp = f"No {submodel_name} found for AAS: {ip_port}"
-            logger.warning(info_temp) if self.logger_on else print(info_temp)
-            return None
-
-    def _put_attachment(self, ip_address, submodelIdentifier, auto_id, idShortPath, aas_file_name, json_data):
-        url = f"http://{ip_address}/submodels/{submodelIdentifier}/submodel-elements/{idShortPath}/attachment?fileName={aas_file_name}"
-        json_string = json.dumps(json_data, indent=4).encode('utf-8')
+        return self.registry.get_all_idShorts()
 
-        multipart_data = MultipartEncoder(
-            fields={
-                'file': (aas_file_name, json_string, 'application/json')
-            }
-        )
-
-        response = requests.put(url, data=multipart_data, headers={'Content-Type': multipart_data.content_type})
-
-        if response.status_code == 200:
-            logger.info(f"Inspection response successfully put into AAS Shell for {auto_id}")
-        else:
-            logger.warning(f"Putting into AAS Shell for {auto_id} failed!")
+    def iter_idShorts(self):
+        """
+        Enumerates all 'idShort' values of the registry page by page, without building the snapshot.
+        :return: Generator of all 'idShort' values.
+        """
+        return self.registry.iter_idShorts()
@@ -0,0 +1,272 @@
+import threading
+import time
+from config.env_config import settings
+from src.utils.AASSession import aas_session_pool
+from src.utils.util_aas import JSONArrayStreamParser
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+class AASRegistry:
+    """
+    AASRegistry Class
+
+    The `AASRegistry` class keeps a shared snapshot of the AAS registry descriptor list and indexes it by idShort,
+    so that endpoint lookups do not have to download and scan the whole registry on every call.
+
+    Attributes:
+        registry_url (str): URL of the AAS registry.
+        ttl (float): Time in seconds after which the snapshot is considered stale.
+        min_refresh_interval (float): Minimum time in seconds between two refreshes forced by a lookup miss.
+        index (dict): Mapping of idShort to the href of its first endpoint.
+        loaded_at (float): Monotonic timestamp of the last successful refresh, or None.
+        last_refresh_ok (bool): Whether the last refresh was successful, or None before the first refresh.
+        version (int): Counter that is incremented whenever the set of idShorts or endpoints changes.
+
+    Methods:
+        __init__(self, registry_url, ttl, min_refresh_interval):
+            Initializes an empty snapshot for the given registry URL.
+
+        get_href(self, id_short):
+            Returns the endpoint href for an idShort, refreshing the snapshot only if it is stale or on a miss.
+            :param id_short: The idShort to look up.
+            :return: The href if found, otherwise None.
+
+        get_all_idShorts(self):
+            Returns all idShorts of the current snapshot.
+            :return: A list of all idShorts.
+
+        iter_descriptors(self, page_size):
+            Enumerates the shell descriptors page by page as a generator, parsing each page while it is received.
+
+        iter_idShorts(self, page_size):
+            Enumerates the idShorts of the registry as a generator.
+
+        refresh(self):
+            Downloads the registry page by page and rebuilds the index.
+            :return: True if the refresh was successful, otherwise False.
+
+        install(self, index):
+            Replaces the snapshot with an index that was fetched elsewhere.
+
+        is_stale(self):
+            Checks whether the snapshot is older than its TTL.
+
+    Usage:
+        registry = get_registry(settings.aas_url)
+        href = registry.get_href("BMW_X7")
+    """
+
+    def __init__(self, registry_url, ttl=settings.aas_registry_ttl,
+                 min_refresh_interval=settings.aas_registry_min_refresh):
+        self.registry_url = registry_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.index = {}
+        self.loaded_at = None
+        self.last_refresh_ok = None
+        self.version = 0
+        self._last_attempt = None
+        self._refresh_lock = threading.Lock()
+        self._background_thread = None
+
+    def is_stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    def get_href(self, id_short):
+        """
+        Get the endpoint href of an idShort from the snapshot.
+        :param id_short: The idShort to look up.
+        :return: The href if found, otherwise None.
+        """
+        self._ensure_fresh()
+        href = self.index.get(id_short)
+        if href is None and self.may_force_refresh():
+            # A miss might be a shell that was registered after the last snapshot
+            self.refresh()
+            href = self.index.get(id_short)
+        return href
+
+    def get_host(self, id_short):
+        """
+        Get the host (ip:port) of the AAS server of an idShort.
+        :param id_short: The idShort to look up.
+        :return: The host if found, otherwise None.
+        """
+        href = self.get_href(id_short)
+        if href:
+            return href.split("/")[2]
+        return None
+
+    def get_all_idShorts(self):
+        """
+        Get all idShorts of the snapshot.
+        :return: A list of all idShorts.
+        """
+        self._ensure_fresh()
+        return list(self.index)
+
+    def refresh(self):
+        """
+        Download the registry and rebuild the idShort index.
+        Concurrent callers wait for the refresh that is already running instead of starting their own.
+        :return: True if the refresh was successful, otherwise False.
+        """
+        started = time.monotonic()
+        with self._refresh_lock:
+            if self.loaded_at is not None and self.loaded_at >= started:
+                return True
+            self._last_attempt = time.monotonic()
+            try:
+                index = build_index(self.iter_descriptors())
+            except Exception as e:
+                logger.error(f"Failed to refresh the AAS registry snapshot: {e}")
+                self.last_refresh_ok = False
+                return False
+            self.install(index)
+            self.last_refresh_ok = True
+            return True
+
+    def iter_descriptors(self, page_size=settings.aas_registry_page_size):
+        """
+        Enumerate the shell descriptors of the registry page by page, following the registry's paging cursor.
+        Each page is parsed while it is being received, so memory stays flat regardless of the registry size.
+        :param page_size: Number of descriptors requested per page.
+        :return: Generator of shell descriptors.
+        """
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            with aas_session_pool.get(self.registry_url, params=params, stream=True) as response:
+                response.raise_for_status()
+                parser = JSONArrayStreamParser("result")
+                for chunk in response.iter_content(chunk_size=8192):
+                    yield from parser.feed(chunk)
+                metadata = parser.close()
+            cursor = next_cursor(metadata, cursor)
+            if cursor is None:
+                return
+
+    def iter_idShorts(self, page_size=settings.aas_registry_page_size):
+        """
+        Enumerate the idShorts of the registry without building the snapshot.
+        :param page_size: Number of descriptors requested per page.
+        :return: Generator of idShorts.
+        """
+        for item in self.iter_descriptors(page_size):
+            if 'idShort' in item:
+                yield item['idShort']
+
+    def install(self, index):
+        """
+        Replace the snapshot with an index that was fetched elsewhere, e.g. by the asynchronous AAS client.
+        :param index: Mapping of idShort to endpoint href.
+        """
+        if index != self.index:
+            self.version += 1
+        self.index = index
+        self.loaded_at = time.monotonic()
+
+    def mark_attempt(self):
+        self._last_attempt = time.monotonic()
+
+    def may_force_refresh(self):
+        return self._last_attempt is None or time.monotonic() - self._last_attempt > self.min_refresh_interval
+
+    def _ensure_fresh(self):
+        if self.loaded_at is None:
+            self.refresh()
+        elif self.is_stale():
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        """
+        Serves the stale snapshot while a single background thread fetches a new one.
+        """
+        if self._background_thread is not None and self._background_thread.is_alive():
+            return
+        self._background_thread = threading.Thread(target=self.refresh, daemon=True)
+        self._background_thread.start()
+
+
+def build_index(descriptors):
+    """
+    Builds the idShort index from the shell descriptors of the AAS registry.
+
+    Args:
+        descriptors (iterable): Shell descriptors, e.g. from `AASRegistry.iter_descriptors()`.
+
+    Returns:
+        dict: Mapping of idShort to the href of its first endpoint.
+
+    Example:
+        index = build_index(registry.iter_descriptors())
+    """
+    index = {}
+    for item in descriptors:
+        add_to_index(index, item)
+    return index
+
+
+def add_to_index(index, descriptor):
+    """
+    Adds the href of the first endpoint of a shell descriptor to an idShort index.
+    The first descriptor of an idShort wins.
+
+    Args:
+        index (dict): Mapping of idShort to endpoint href.
+        descriptor (dict): Shell descriptor of the AAS registry.
+    """
+    id_short = descriptor.get('idShort')
+    if id_short is None:
+        return
+    endpoints = descriptor.get("endpoints")
+    href = endpoints[0].get("protocolInformation", {}).get("href") if endpoints else None
+    index.setdefault(id_short, href)
+
+
+def next_cursor(metadata, previous_cursor=None):
+    """
+    Reads the cursor of the next page from the paging metadata of a registry page.
+
+    Args:
+        metadata (dict): The registry page without its 'result' items.
+        previous_cursor (str, optional): The cursor of the page that was just read, to stop on a repeated cursor.
+
+    Returns:
+        str or None: The cursor of the next page, or None if this was the last page.
+
+    Example:
+        cursor = next_cursor({"paging_metadata": {"cursor": "c2hlbGwtMTAw"}})
+    """
+    cursor = (metadata.get("paging_metadata") or {}).get("cursor")
+    if not cursor or cursor == previous_cursor:
+        return None
+    return cursor
+
+
+def get_registry(registry_url=settings.aas_url):
+    """
+    Returns the shared registry snapshot for a registry URL, creating it on first use.
+
+    Args:
+        registry_url (str): URL of the AAS registry.
+
+    Returns:
+        AASRegistry: The shared registry snapshot.
+
+    Example:
+        registry = get_registry(settings.aas_url)
+    """
+    with _registries_lock:
+        registry = _registries.get(registry_url)
+        if registry is None:
+            registry = AASRegistry(registry_url)
+            _registries[registry_url] = registry
+        return registry
@@ -0,0 +1,103 @@
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config.env_config import settings
+from src.utils.CircuitBreaker import CircuitOpenError, aas_circuit_breakers
+
+
+class AASSessionPool:
+    """
+    AASSessionPool Class
+
+    The `AASSessionPool` class keeps one keep-alive `requests.Session` per AAS host, so that registry, submodel and
+    attachment requests reuse their TCP connections instead of opening a new one for every call. Every request
+    passes the circuit breaker of its host and fails fast with `CircuitOpenError` while the breaker is open.
+
+    Attributes:
+        pool_size (int): Maximum number of kept-alive connections per host.
+        retry_total (int): Number of retries for failed connections and 502/503/504 responses of idempotent requests.
+        retry_backoff (float): Backoff factor in seconds between the retries.
+        timeout (tuple): Default (connect, read) timeout in seconds for every request.
+        breakers (CircuitBreakerRegistry): Circuit breakers per host.
+
+    Methods:
+        get_session(self, host):
+            Returns the session of a host, creating it on first use.
+
+        request(self, method, url, **kwargs):
+            Sends a request through the session of the URL's host, using the default timeout if none is given.
+            Connection errors, timeouts and 5xx responses count as failures of the host's circuit breaker.
+
+        get(self, url, **kwargs):
+            Sends a GET request.
+
+        put(self, url, **kwargs):
+            Sends a PUT request.
+
+        close(self):
+            Closes all sessions and their connections.
+
+    Usage:
+        response = aas_session_pool.get("http://192.168.0.10:8081/submodels/$metadata")
+    """
+
+    def __init__(self, pool_size=settings.aas_pool_size, retry_total=settings.aas_retry_total,
+                 retry_backoff=settings.aas_retry_backoff,
+                 timeout=(settings.aas_connect_timeout, settings.aas_read_timeout)):
+        self.pool_size = pool_size
+        self.retry_total = retry_total
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.breakers = aas_circuit_breakers
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                retry = Retry(total=self.retry_total, backoff_factor=self.retry_backoff,
+                              status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET", "HEAD"}),
+                              raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        breaker = self.breakers.get(host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(host)
+        try:
+            response = self.get_session(host).request(method, url, **kwargs)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        finally:
+            breaker.release_probe()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+aas_session_pool = AASSessionPool()
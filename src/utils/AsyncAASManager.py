@@ -0,0 +1,329 @@
+import asyncio
+import json
+import httpx
+from config.env_config import settings
+from src.utils.util_aas import encode_to_base64
+from src.utils.AASRegistry import get_registry, add_to_index, next_cursor
+from src.utils.util_aas import JSONArrayStreamParser
+from src.utils.AASCache import submodel_identifier_cache, attachment_cache
+from src.utils.CircuitBreaker import CircuitOpenError, aas_circuit_breakers
+from src.utils.SingleFlight import aas_single_flight
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+
+class AsyncAASManager:
+    """
+    AsyncAASManager Class
+
+    The `AsyncAASManager` class implements the AAS requests as coroutines, so that the inspection plans and
+    responses of many vehicles can be fetched concurrently on one event loop instead of one blocking thread per
+    request. `AASManager` is a thin synchronous wrapper that runs these coroutines on a shared background loop.
+
+    Attributes:
+        logger_on (bool): If False, the manager is quiet and logs its messages at DEBUG level only, e.g. for the
+            periodic prefetch of all inspection plans.
+        AAS_Registry_URL (str): URL of the AAS registry.
+        registry (AASRegistry): Shared, TTL-cached snapshot of the AAS registry indexed by idShort.
+        submodel_cache (SubmodelIdentifierCache): Shared cache of submodel identifiers per (host, idShort).
+        attachment_cache (AttachmentCache): Shared cache of parsed attachments, revalidated with conditional requests.
+        client (httpx.AsyncClient): Keep-alive HTTP client, created on first use on the running event loop.
+        breakers (CircuitBreakerRegistry): Circuit breakers per host, shared with `AASSessionPool`.
+        single_flight (AsyncSingleFlight): Shared by all managers, lets concurrent identical lookups share one fetch.
+
+    Methods:
+        get_inspection_plan(self, auto_id):
+            Retrieves the inspection plan for a given auto_id.
+
+        get_inspection_response(self, auto_id):
+            Retrieves the inspection response for a given auto_id.
+
+        put_inspection_response(self, auto_id, json_dict):
+            Submits the inspection response (in JSON format) for a given auto_id.
+            Returns True if the response was put into the AAS, otherwise False.
+
+        get_all_idShorts(self):
+            Returns all idShorts of the registry snapshot.
+
+        get_inspection_plans(self, auto_ids):
+            Retrieves the inspection plans of several auto_ids concurrently.
+
+        iter_descriptors(self, page_size):
+            Enumerates the shell descriptors of the registry page by page as an async generator.
+
+        aclose(self):
+            Closes the HTTP client and its connections.
+
+    Usage:
+        async with AsyncAASManager() as aas_manager:
+            plans = await aas_manager.get_inspection_plans(["BMW_X7", "BMW_M4"])
+    """
+
+    def __init__(self, logger_on=True):
+        self.logger_on = logger_on
+        self.AAS_Registry_URL = settings.aas_url
+        self.registry = get_registry(self.AAS_Registry_URL)
+        self.submodel_cache = submodel_identifier_cache
+        self.attachment_cache = attachment_cache
+        self.client = None
+        self.breakers = aas_circuit_breakers
+        self.single_flight = aas_single_flight
+        self._registry_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _get_client(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.aas_read_timeout, connect=settings.aas_connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=settings.aas_pool_size),
+                transport=httpx.AsyncHTTPTransport(retries=settings.aas_retry_total))
+        return self.client
+
+    async def _request(self, method, url, **kwargs):
+        """
+        Sends a request through the circuit breaker of the URL's host.
+        """
+        breaker = self._acquire_breaker(url)
+        try:
+            response = await self._get_client().request(method, url, **kwargs)
+            self._record_response(breaker, response)
+            return response
+        except httpx.HTTPError:
+            breaker.record_failure()
+            raise
+        finally:
+            breaker.release_probe()
+
+    def _acquire_breaker(self, url):
+        host = httpx.URL(url).netloc.decode()
+        breaker = self.breakers.get(host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(host)
+        return breaker
+
+    @staticmethod
+    def _record_response(breaker, response):
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    async def get_inspection_plan(self, auto_id):
+        """
+        Get inspection plan by auto_id. Concurrent calls for the same auto_id share one fetch.
+        :param auto_id: The ID of the auto for which to fetch the inspection plan.
+        :return: The inspection plan or None if an error occurs.
+        """
+        return await self.single_flight.do(("Inspection_Plan", auto_id), self._fetch_inspection_plan, auto_id)
+
+    async def _fetch_inspection_plan(self, auto_id):
+        try:
+            ip = await self._find_host(auto_id)
+            if ip:
+                submodelIdentifier = await self._get_submodelIdentifier(ip, "Inspection_Plan")
+                return await self._get_attachment(ip, submodelIdentifier, "Inspection_Plan", "Inspection_Plan")
+        except Exception as e:
+            info_temp = f"Failed to get inspection plan from AAS Shell for {auto_id}: {e}"
+            logger.error(info_temp) if self.logger_on else logger.debug(info_temp)
+        return None
+
+    async def get_inspection_response(self, auto_id):
+        """
+        Get inspection response by auto_id. Concurrent calls for the same auto_id share one fetch.
+        :param auto_id: The ID of the auto for which to fetch the inspection response.
+        :return: The inspection response or None if an error occurs.
+        """
+        return await self.single_flight.do(("Response_Plan", auto_id), self._fetch_inspection_response, auto_id)
+
+    async def _fetch_inspection_response(self, auto_id):
+        try:
+            ip = await self._find_host(auto_id)
+            if ip:
+                submodelIdentifier = await self._get_submodelIdentifier(ip, "Response_Plan")
+                return await self._get_attachment(ip, submodelIdentifier, "Response_Placeholder", "Response_Plan")
+        except Exception as e:
+            info_temp = f"Failed to get inspection response from AAS Shell for {auto_id}: {e}"
+            logger.error(info_temp) if self.logger_on else logger.debug(info_temp)
+        return None
+
+    async def put_inspection_response(self, auto_id, json_dict):
+        """
+        Put inspection response (JSON) by auto_id.
+        :param auto_id: The ID of the auto for which to submit the inspection response.
+        :param json_dict: The inspection response data in JSON format.
+        :return: True if the response was put into the AAS, otherwise False.
+        """
+        try:
+            ip = await self._find_host(auto_id)
+            if ip:
+                submodelIdentifier = await self._get_submodelIdentifier(ip, "Response_Plan")
+                return await self._put_attachment(ip, submodelIdentifier, auto_id, "Response_Placeholder",
+                                                  "InspectionResponse.json", json_dict, "Response_Plan")
+        except Exception as e:
+            logger.error(e)
+        return False
+
+    async def get_all_idShorts(self):
+        """
+        Extracts all 'idShort' values from the registry snapshot.
+        :return: A list of all 'idShort' values.
+        """
+        if self.registry.is_stale():
+            await self._refresh_registry()
+        return list(self.registry.index)
+
+    async def iter_descriptors(self, page_size=settings.aas_registry_page_size):
+        """
+        Enumerate the shell descriptors of the registry page by page as an async generator.
+        :param page_size: Number of descriptors requested per page.
+        :return: Async generator of shell descriptors.
+        """
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            breaker = self._acquire_breaker(self.AAS_Registry_URL)
+            try:
+                async with self._get_client().stream("GET", self.AAS_Registry_URL, params=params) as response:
+                    self._record_response(breaker, response)
+                    response.raise_for_status()
+                    parser = JSONArrayStreamParser("result")
+                    async for chunk in response.aiter_bytes():
+                        for item in parser.feed(chunk):
+                            yield item
+                    metadata = parser.close()
+            except httpx.TransportError:
+                breaker.record_failure()
+                raise
+            finally:
+                breaker.release_probe()
+            cursor = next_cursor(metadata, cursor)
+            if cursor is None:
+                return
+
+    async def get_inspection_plans(self, auto_ids):
+        """
+        Get the inspection plans of several auto_ids concurrently.
+        :param auto_ids: The IDs of the autos for which to fetch the inspection plans.
+        :return: A dictionary of auto_id to inspection plan (None if an error occurred).
+        """
+        auto_ids = list(auto_ids)
+        plans = await asyncio.gather(*(self.get_inspection_plan(auto_id) for auto_id in auto_ids))
+        return dict(zip(auto_ids, plans))
+
+    async def _find_host(self, auto_id):
+        if self.registry.is_stale():
+            await self._refresh_registry()
+        href = self.registry.index.get(auto_id)
+        if href is None and self.registry.may_force_refresh():
+            await self._refresh_registry()
+            href = self.registry.index.get(auto_id)
+        if href:
+            ip = href.split("/")[2]
+            info_temp = f"IP found in AAS Shell: {ip} for Auto ID: {auto_id}"
+            logger.info(info_temp) if self.logger_on else logger.debug(info_temp)
+            return ip
+        return None
+
+    async def _refresh_registry(self):
+        if self._registry_lock is None:
+            self._registry_lock = asyncio.Lock()
+        loaded_at = self.registry.loaded_at
+        async with self._registry_lock:
+            if self.registry.loaded_at != loaded_at:
+                return
+            self.registry.mark_attempt()
+            try:
+                index = {}
+                async for item in self.iter_descriptors():
+                    add_to_index(index, item)
+                self.registry.install(index)
+                self.registry.last_refresh_ok = True
+            except Exception as e:
+                logger.error(f"Failed to refresh the AAS registry snapshot: {e}")
+                self.registry.last_refresh_ok = False
+
+    async def _get_submodelIdentifier(self, aas_ip_port, idShort):
+        id_base64 = self.submodel_cache.get(aas_ip_port, str(idShort))
+        if id_base64 is not None:
+            return id_base64
+        submodels = await self.single_flight.do(("submodels", aas_ip_port), self._get_submodel_metadata, aas_ip_port)
+        for model in submodels:
+            if "idShort" in model and "id" in model:
+                self.submodel_cache.put(aas_ip_port, model["idShort"], encode_to_base64(model["id"]))
+        id_base64 = self.submodel_cache.get(aas_ip_port, str(idShort))
+        if id_base64 is not None:
+            info_temp = f"Submodel Identifier: {id_base64}"
+            logger.info(info_temp) if self.logger_on else logger.debug(info_temp)
+            return id_base64
+        logger.warning(f"No submodel identifier found for AAS: {aas_ip_port}")
+        return None
+
+    async def _get_submodel_metadata(self, aas_ip_port):
+        response = await self._request("GET", f"http://{aas_ip_port}/submodels/$metadata")
+        if response.status_code != 200:
+            response = await self._request("GET", f"http://{aas_ip_port}/submodels?level=core&extent=withoutBlobValue")
+        return response.json().get("result", [])
+
+    async def _get_attachment(self, ip_port, submodelIdentifier, idShortPath, submodel_idShort=None):
+        url = f"http://{ip_port}/submodels/{submodelIdentifier}/submodel-elements/{idShortPath}/attachment"
+        submodel_name = idShortPath.replace("_", " ")
+        response = await self._request("GET", url, headers=self.attachment_cache.conditional_headers(url))
+        if response.status_code == 304:
+            inspection_attachment = self.attachment_cache.get(url)
+            if inspection_attachment is not None:
+                return inspection_attachment
+            response = await self._request("GET", url)
+        if response.status_code == 200:
+            inspection_attachment = response.json()
+            self.attachment_cache.store(url, response.headers, inspection_attachment)
+            info_temp = f"{submodel_name}: {inspection_attachment}"
+            logger.info(info_temp) if self.logger_on else logger.debug(info_temp)
+            return inspection_attachment
+        elif response.status_code == 404 and submodel_idShort and await self._is_submodel_missing(
+                ip_port, submodelIdentifier):
+            self.submodel_cache.invalidate_identifier(ip_port, submodelIdentifier)
+            submodelIdentifier = await self._get_submodelIdentifier(ip_port, submodel_idShort)
+            return await self._get_attachment(ip_port, submodelIdentifier, idShortPath)
+        info_temp = f"No {submodel_name} found for AAS: {ip_port}"
+        logger.warning(info_temp) if self.logger_on else logger.debug(info_temp)
+        return None
+
+    async def _put_attachment(self, ip_address, submodelIdentifier, auto_id, idShortPath, aas_file_name, json_data,
+                              submodel_idShort=None):
+        url = f"http://{ip_address}/submodels/{submodelIdentifier}/submodel-elements/{idShortPath}/attachment"
+        json_string = json.dumps(json_data, indent=4).encode('utf-8')
+        response = await self._request("PUT", url, params={"fileName": aas_file_name},
+                                                 files={'file': (aas_file_name, json_string, 'application/json')})
+        if response.status_code == 200:
+            logger.info(f"Inspection response successfully put into AAS Shell for {auto_id}")
+            self.attachment_cache.invalidate(url)
+            return True
+        elif response.status_code == 404 and submodel_idShort and await self._is_submodel_missing(
+                ip_address, submodelIdentifier):
+            self.submodel_cache.invalidate_identifier(ip_address, submodelIdentifier)
+            submodelIdentifier = await self._get_submodelIdentifier(ip_address, submodel_idShort)
+            return await self._put_attachment(ip_address, submodelIdentifier, auto_id, idShortPath, aas_file_name,
+                                              json_data)
+        logger.warning(f"Putting into AAS Shell for {auto_id} failed!")
+        return False
+
+    async def _is_submodel_missing(self, ip_port, submodelIdentifier):
+        """
+        Checks whether the AAS server doesn't know the submodel anymore, i.e. its identifier is outdated. A 404 of a
+        missing element of an existing submodel, e.g. an empty Response_Placeholder, doesn't make it outdated.
+        """
+        response = await self._request("GET", f"http://{ip_port}/submodels/{submodelIdentifier}/$metadata")
+        return response.status_code == 404
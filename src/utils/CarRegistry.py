@@ -0,0 +1,252 @@
+import copy
+import json
+import os
+import threading
+import time
+from config.env_config import settings
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+
+def normalize_auto_id(auto_id):
+    """
+    Normalizes an auto ID for comparisons, e.g. 'BMW_X7' and 'bmwx7' are the same car.
+
+    Args:
+        auto_id (str): The auto ID to normalize.
+
+    Returns:
+        str: The auto ID without underscores in lower case.
+    """
+    return (auto_id or "").replace("_", "").lower()
+
+
+class CarRegistry:
+    """
+    CarRegistry Class
+
+    The `CarRegistry` class loads the cars configuration once and keeps hash indexes for RFID to auto ID,
+    auto ID to model and normalized auto ID to model, so that lookups on the RFID hot path are O(1) and don't
+    touch the disk. The configuration is reloaded when the modification time of the file changes, which is
+    checked at most every `check_interval` seconds. Writes are serialized with a lock and replace the file atomically.
+
+    Attributes:
+        path (str): Path of the cars configuration JSON file.
+        check_interval (float): Minimum time in seconds between two checks of the file modification time.
+
+    Methods:
+        get_cars(self):
+            Returns a copy of the cars configuration.
+
+        get_auto_id(self, rfid):
+            Returns the auto ID of an RFID.
+
+        get_car_name(self, auto_id):
+            Returns the model name of an auto ID.
+
+        get_rfid(self, auto_id):
+            Returns the RFID of an auto ID.
+
+        normalized_auto_ids(self):
+            Returns the set of normalized auto IDs.
+
+        add_cars(self, auto_id_list):
+            Adds the auto IDs that are not in the configuration yet.
+
+        remove_cars(self, auto_id_list):
+            Removes the cars of the given auto IDs.
+
+        set_rfid(self, auto_id, new_rfid):
+            Sets the RFID of an auto ID.
+
+        set_rfids(self, mapping):
+            Sets the RFIDs of several auto IDs with a single write.
+
+        save_cars(self, data):
+            Replaces the whole cars configuration.
+
+    Usage:
+        car_registry = CarRegistry(cars_config_json_path)
+        auto_id = car_registry.get_auto_id("ANT1E00401002085C43D8")
+    """
+
+    def __init__(self, path, check_interval=settings.cars_config_check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self._data = None
+        self._mtime = None
+        self._checked_at = None
+        self._rfid_index = {}
+        self._auto_id_index = {}
+        self._normalized_index = {}
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            try:
+                self._reload_if_changed()
+            finally:
+                self._checked_at = now
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            logger.error(f'cars_config file on {str(self.path)} not found')
+            self._install(None, None)
+            return
+        if self._data is not None and mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (IOError, json.JSONDecodeError) as e:
+            logger.error(f'Failed to read cars_config file on {str(self.path)}: {e}')
+            return
+        self._install(data, mtime)
+
+    def _install(self, data, mtime):
+        rfid_index = {}
+        auto_id_index = {}
+        normalized_index = {}
+        for model, details in (data or {}).items():
+            auto_id = next((d.get('AutoID') for d in details if 'AutoID' in d), None)
+            for d in details:
+                if 'RFID' in d:
+                    rfid_index.setdefault(d.get('RFID'), auto_id)
+                if 'AutoID' in d:
+                    auto_id_index.setdefault(d.get('AutoID'), model)
+                    normalized_index.setdefault(normalize_auto_id(d.get('AutoID')), model)
+        self._rfid_index = rfid_index
+        self._auto_id_index = auto_id_index
+        self._normalized_index = normalized_index
+        self._data = data
+        self._mtime = mtime
+
+    def save_cars(self, data):
+        """
+        Replaces the whole cars configuration.
+        :param data: The car configuration data to save.
+        :return: True if data is successfully written; False otherwise due to an IO error.
+        """
+        with self._lock:
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, 'w') as file:
+                    json.dump(data, file, indent=4)
+                os.replace(temp_path, self.path)
+            except IOError as e:
+                logger.warning(f'Failed to write to cars_confing.json')
+                return False
+            self._install(data, os.stat(self.path).st_mtime_ns)
+            return True
+
+    def get_cars(self):
+        self._ensure_loaded()
+        return copy.deepcopy(self._data)
+
+    def get_auto_id(self, rfid):
+        self._ensure_loaded()
+        return self._rfid_index.get(rfid)
+
+    def get_car_name(self, auto_id):
+        self._ensure_loaded()
+        return self._auto_id_index.get(auto_id)
+
+    def get_rfid(self, auto_id):
+        self._ensure_loaded()
+        model = self._auto_id_index.get(auto_id)
+        if model is None:
+            return None
+        return next((d.get('RFID') for d in self._data[model] if 'RFID' in d), None)
+
+    def normalized_auto_ids(self):
+        self._ensure_loaded()
+        return set(self._normalized_index)
+
+    def add_cars(self, auto_id_list):
+        """
+        Adds the auto IDs that are not in the configuration yet, compared by their normalized form.
+        :param auto_id_list: List of auto IDs.
+        :return: True if cars were added and saved, False if saving failed, None if nothing changed.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._data is None:
+                return None
+            data = copy.deepcopy(self._data)
+            known_auto_ids = set(self._normalized_index)
+            data_changed = False
+            for auto_id in auto_id_list:
+                if normalize_auto_id(auto_id) in known_auto_ids:
+                    continue
+                key_name = auto_id.replace('_', ' ')
+                data[key_name] = [{"RFID": None}, {"AutoID": auto_id}]
+                known_auto_ids.add(normalize_auto_id(auto_id))
+                data_changed = True
+                logger.info(f'Car {auto_id} added to cars_confing')
+            if data_changed:
+                return self.save_cars(data)
+            return None
+
+    def remove_cars(self, auto_id_list):
+        """
+        Removes the cars of the given auto IDs, compared by their normalized form.
+        :param auto_id_list: List of auto IDs.
+        :return: True if cars were removed and saved, False if saving failed, None if nothing changed.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._data is None:
+                return None
+            removed_auto_ids = {normalize_auto_id(auto_id) for auto_id in auto_id_list}
+            data = {}
+            for model, details in self._data.items():
+                auto_id = next((d.get('AutoID') for d in details if 'AutoID' in d), None)
+                if normalize_auto_id(auto_id) in removed_auto_ids:
+                    logger.info(f'Car {auto_id} removed from cars_confing')
+                    continue
+                data[model] = copy.deepcopy(details)
+            if len(data) != len(self._data):
+                return self.save_cars(data)
+            return None
+
+    def set_rfid(self, auto_id, new_rfid):
+        """
+        Sets the RFID of an auto ID.
+        :param auto_id: The auto ID whose RFID needs to be updated.
+        :param new_rfid: The new RFID.
+        :return: True if the RFID is updated and saved successfully; False otherwise.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            model_name = self._auto_id_index.get(auto_id)
+            if not model_name:
+                logger.warning(f"AutoID {auto_id} not found in cars_confing. Couldn\'t set the new rfid!")
+                return False
+            data = copy.deepcopy(self._data)
+            data[model_name] = [{"RFID": new_rfid}, {"AutoID": auto_id}]
+            return self.save_cars(data)
+
+    def set_rfids(self, mapping):
+        """
+        Sets the RFIDs of several auto IDs with a single write. Nothing is changed if one of the auto IDs is unknown.
+        :param mapping: Dictionary of auto ID to new RFID.
+        :return: True if the RFIDs are updated and saved successfully; False otherwise.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._data is None:
+                return False
+            data = copy.deepcopy(self._data)
+            for auto_id, new_rfid in mapping.items():
+                model_name = self._auto_id_index.get(auto_id)
+                if not model_name:
+                    logger.warning(f"AutoID {auto_id} not found in cars_confing. Couldn\'t set the new rfids!")
+                    return False
+                data[model_name] = [{"RFID": new_rfid}, {"AutoID": auto_id}]
+            return self.save_cars(data)
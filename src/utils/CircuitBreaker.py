@@ -0,0 +1,143 @@
+import threading
+import time
+from config.env_config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request to a host whose circuit breaker is open.
+    """
+
+    def __init__(self, host):
+        super().__init__(f"Circuit breaker for {host} is open")
+        self.host = host
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker Class
+
+    The `CircuitBreaker` class tracks the failures of one host. After `failure_threshold` consecutive failures the
+    breaker opens and requests to the host fail fast. After `reset_timeout` seconds a single probe request is let
+    through (half-open): if it succeeds the breaker closes again, otherwise it stays open for another period.
+
+    Attributes:
+        host (str): IP and port of the host.
+        failure_threshold (int): Number of consecutive failures that open the breaker.
+        reset_timeout (float): Time in seconds the breaker stays open before a probe request is allowed.
+        state (str): 'closed', 'open' or 'half-open'.
+        failures (int): Number of consecutive failures.
+        last_ok (bool): Outcome of the last request, or None if no request was sent yet.
+
+    Methods:
+        allow_request(self):
+            Returns True if a request may be sent to the host.
+
+        record_success(self):
+            Records a successful request and closes the breaker.
+
+        record_failure(self):
+            Records a failed request and opens the breaker if the threshold is reached.
+
+        release_probe(self):
+            Lets the next probe through if a probe request ended without an outcome, e.g. with an unexpected error.
+
+        can_request(self):
+            Returns True if a request would be let through, without reserving the probe of a half-open breaker.
+
+        status(self):
+            Returns the state of the breaker as a dictionary.
+
+    Usage:
+        breaker = CircuitBreaker("192.168.0.10:8081")
+        if breaker.allow_request():
+            ...
+    """
+
+    def __init__(self, host, failure_threshold=settings.aas_breaker_failures,
+                 reset_timeout=settings.aas_breaker_reset):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.last_ok = None
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.last_ok = True
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.last_ok = False
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def can_request(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def status(self):
+        return {"host": self.host, "state": self.state, "failures": self.failures, "last_ok": self.last_ok}
+
+
+class CircuitBreakerRegistry:
+    """
+    Keeps one `CircuitBreaker` per host.
+
+    Usage:
+        breaker = aas_circuit_breakers.get("192.168.0.10:8081")
+        states = aas_circuit_breakers.states()
+    """
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host)
+                self._breakers[host] = breaker
+            return breaker
+
+    def states(self):
+        with self._lock:
+            return [breaker.status() for breaker in self._breakers.values()]
+
+
+aas_circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,158 @@
+import time
+from src.utils.util_inspection_response import _transform_detections
+
+MAX = "max"
+MAJORITY = "majority"
+EWMA = "ewma"
+RULES = (MAX, MAJORITY, EWMA)
+
+
+class DetectionAggregator:
+    """
+    DetectionAggregator Class
+
+    The `DetectionAggregator` class combines the camera responses of several frames of one vehicle pass into one
+    simplified inspection response, so that a faster but noisier camera model can be used without losing accuracy.
+    Frames are folded into a running state per class as they arrive, so memory stays O(classes) regardless of the
+    number of frames. The pass is complete when `frame_count` frames were added or the deadline has passed.
+
+    Frames merged from several cameras can be 'partial' (see `merge_camera_responses`). A camera counts as missing
+    for the pass if it is missing in every frame, as its classes were then never seen.
+
+    Rules:
+        max: The frame with the highest confidence of a class decides, 'in_place' is its confidence above the
+            threshold. With one frame this is exactly `get_simplified_inspection_response`.
+        majority: A class is 'in_place' if its confidence is above the threshold in more than half of the frames,
+            and 'free_of_damage' if more than half of the frames that detected it say so.
+        ewma: The confidence and 'free_of_damage' are smoothed with an exponentially weighted moving average over
+            the frames, frames without a detection count as 0. 'in_place' is the average above the threshold and
+            'free_of_damage' the average of at least 0.5.
+
+    Attributes:
+        rule (str): 'max', 'majority' or 'ewma'.
+        frame_count (int): Number of frames after which the pass is complete.
+        deadline (float): Monotonic time after which the pass is complete, or None.
+        threshold (float): Confidence threshold for 'in_place'.
+        alpha (float): Weight of the newest frame for the 'ewma' rule.
+        frames (int): Number of frames added so far.
+        missing_cameras (list): Cameras that didn't reply in any of the frames added so far.
+
+    Methods:
+        add_frame(self, camera_response):
+            Folds the detections of one frame into the state and returns True if the pass is complete.
+
+        is_complete(self):
+            Returns True if the frame count or the deadline is reached.
+
+        remaining_time(self):
+            Returns the time in seconds until the deadline, or None if there is no deadline.
+
+        result(self):
+            Returns the simplified inspection response of the frames added so far.
+
+    Usage:
+        aggregator = DetectionAggregator(rule="majority", frame_count=5, timeout=3)
+        while not aggregator.is_complete():
+            camera_response = mqtt_client.request_response_cv(timeout=aggregator.remaining_time())
+            if camera_response is not None:
+                aggregator.add_frame(camera_response)
+        camera_response_simplified = aggregator.result()
+    """
+
+    def __init__(self, rule=MAX, frame_count=1, timeout=None, threshold=0.6, alpha=0.5):
+        if rule not in RULES:
+            raise ValueError(f"Unknown aggregation rule {rule}, expected one of {', '.join(RULES)}")
+        self.rule = rule
+        self.frame_count = max(1, frame_count)
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.threshold = threshold
+        self.alpha = alpha
+        self.frames = 0
+        self.missing_cameras = []
+        self._state = {}
+
+    def add_frame(self, camera_response):
+        """
+        Fold the detections of one frame into the state.
+        :param camera_response: The camera response with 'detections' and 'classes'.
+        :return: True if the pass is complete.
+        """
+        detections_by_class = _transform_detections(camera_response)
+        frame_missing_cameras = camera_response.get("missing_cameras") or []
+        if self.frames == 0:
+            self.missing_cameras = list(frame_missing_cameras)
+        else:
+            self.missing_cameras = [camera for camera in self.missing_cameras if camera in frame_missing_cameras]
+        self.frames += 1
+        if self.rule == MAX:
+            self._add_max(detections_by_class)
+        elif self.rule == MAJORITY:
+            self._add_majority(detections_by_class)
+        else:
+            self._add_ewma(detections_by_class)
+        return self.is_complete()
+
+    def _add_max(self, detections_by_class):
+        for class_name, details in detections_by_class.items():
+            state = self._state.get(class_name)
+            if state is None or details["detection_confidence"] > state["detection_confidence"]:
+                self._state[class_name] = details
+
+    def _add_majority(self, detections_by_class):
+        for class_name, details in detections_by_class.items():
+            # [class_id, frames in place, frames detected, frames free of damage]
+            state = self._state.setdefault(class_name, [details["class_id"], 0, 0, 0])
+            state[1] += details["detection_confidence"] > self.threshold
+            state[2] += 1
+            state[3] += details["free_of_damage"] is True
+
+    def _add_ewma(self, detections_by_class):
+        first_frame = self.frames == 1
+        for class_name, state in self._state.items():
+            if class_name not in detections_by_class:
+                # [class_id, confidence average, free_of_damage average]
+                state[1] *= 1 - self.alpha
+                state[2] *= 1 - self.alpha
+        for class_name, details in detections_by_class.items():
+            confidence = details["detection_confidence"]
+            free_of_damage = 1.0 if details["free_of_damage"] is True else 0.0
+            state = self._state.get(class_name)
+            if state is None:
+                weight = 1.0 if first_frame else self.alpha
+                self._state[class_name] = [details["class_id"], weight * confidence, weight * free_of_damage]
+            else:
+                state[1] = self.alpha * confidence + (1 - self.alpha) * state[1]
+                state[2] = self.alpha * free_of_damage + (1 - self.alpha) * state[2]
+
+    def is_complete(self):
+        if self.frames >= self.frame_count:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining_time(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def result(self):
+        """
+        Get the simplified inspection response of the frames added so far.
+        :return: A dictionary of class name to 'class_id', 'in_place' and 'free_of_damage'.
+        """
+        if self.rule == MAX:
+            return {class_name: {
+                "class_id": details["class_id"],
+                "in_place": details["detection_confidence"] > self.threshold,
+                "free_of_damage": details["free_of_damage"]
+            } for class_name, details in self._state.items()}
+        if self.rule == MAJORITY:
+            return {class_name: {
+                "class_id": class_id,
+                "in_place": in_place * 2 > self.frames,
+                "free_of_damage": free_of_damage * 2 > detected
+            } for class_name, (class_id, in_place, detected, free_of_damage) in self._state.items()}
+        return {class_name: {
+            "class_id": class_id,
+            "in_place": confidence > self.threshold,
+            "free_of_damage": free_of_damage >= 0.5
+        } for class_name, (class_id, confidence, free_of_damage) in self._state.items()}
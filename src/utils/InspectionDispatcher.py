@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import deque
+from config.env_config import settings
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+DROP_OLDEST = "drop_oldest"
+REJECT = "reject"
+POLICIES = (DROP_OLDEST, REJECT)
+
+
+class InspectionDispatcher:
+    """
+    InspectionDispatcher Class
+
+    The `InspectionDispatcher` class runs inspections on a bounded pool of worker threads, so that the OPC UA data
+    change notification only has to parse the RFID tag and enqueue it instead of running the whole inspection (plan
+    fetch, camera trigger, response build) on the subscription thread.
+
+    An inspection has two stages. `prepare` (e.g. the plan fetch) runs concurrently on the workers. `process` (e.g.
+    the camera trigger) runs for one event at a time and in the order the events were submitted, because the
+    station has one camera: an older read must never trigger it after a newer one.
+
+    If the queue is full, the overload policy decides: 'reject' (default) discards the new event, 'drop_oldest'
+    discards the oldest waiting event in favour of the new one. Both are logged and counted. Every event that is
+    dropped, rejected or whose processing raised an exception is reported to `on_drop`.
+
+    Attributes:
+        prepare (callable): Called with the event on a worker thread, concurrently with other events.
+        process (callable): Called with the event and the result of `prepare`, one event at a time in submit order.
+        max_queue_size (int): Maximum number of waiting events.
+        worker_count (int): Number of worker threads.
+        policy (str): Overload policy, 'reject' or 'drop_oldest'.
+        on_drop (callable): Called with every event that was dropped, rejected or failed, or None.
+        processed (int): Number of processed events.
+        failed (int): Number of events whose processing raised an exception.
+        dropped (int): Number of waiting events dropped for a newer one.
+        rejected (int): Number of new events rejected because the queue was full.
+
+    Methods:
+        start(self):
+            Starts the worker threads.
+
+        stop(self, timeout=5):
+            Processes the queued events and stops the worker threads.
+
+        submit(self, event):
+            Enqueues an event for processing.
+            :return: True if the event was accepted, False if it was rejected.
+
+        stats(self):
+            Returns the queue depth, the wait time in the queue and the counters.
+
+    Usage:
+        dispatcher = InspectionDispatcher(handler.prepare_inspection, handler.run_inspection, on_drop=debouncer.forget)
+        dispatcher.start()
+        dispatcher.submit("ANT1E00401002085C43D8")
+    """
+
+    def __init__(self, prepare, process, max_queue_size=settings.inspection_queue_size,
+                 worker_count=settings.inspection_workers, policy=settings.inspection_overload_policy, on_drop=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy {policy}, expected one of {', '.join(POLICIES)}")
+        self.prepare = prepare
+        self.process = process
+        self.max_queue_size = max_queue_size
+        self.worker_count = worker_count
+        self.policy = policy
+        self.on_drop = on_drop
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.last_wait = None
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+        self._in_flight = 0
+        self._queue = deque()
+        self._next_sequence = 0
+        self._turn = 0
+        self._skipped = set()
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._workers = []
+
+    def start(self):
+        if any(worker.is_alive() for worker in self._workers):
+            return
+        with self._condition:
+            self._stopping = False
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(self.worker_count)]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self, timeout=5):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def submit(self, event):
+        with self._condition:
+            dropped_event = None
+            if len(self._queue) >= self.max_queue_size:
+                if self.policy == REJECT:
+                    self.rejected += 1
+                    dropped_event = event
+                    logger.warning(f"Inspection queue is full, {event} was rejected")
+                else:
+                    dropped_sequence, dropped_event, _ = self._queue.popleft()
+                    self._skip(dropped_sequence)
+                    self.dropped += 1
+                    logger.warning(f"Inspection queue is full, {dropped_event} was dropped for {event}")
+            if dropped_event is not event:
+                self._queue.append((self._next_sequence, event, time.monotonic()))
+                self._next_sequence += 1
+                self._condition.notify_all()
+        if dropped_event is not None:
+            self._report_drop(dropped_event)
+        return dropped_event is not event
+
+    def _report_drop(self, event):
+        if self.on_drop is None:
+            return
+        try:
+            self.on_drop(event)
+        except Exception:
+            logger.exception(f"Unhandled exception occurred while reporting the drop of {event}!")
+
+    def _skip(self, sequence):
+        """
+        Marks a sequence number as done without processing, so that the events after it can take their turn.
+        Must be called with the condition held.
+        """
+        self._skipped.add(sequence)
+        while self._turn in self._skipped:
+            self._skipped.remove(self._turn)
+            self._turn += 1
+        self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if not self._queue:
+                    break
+                sequence, event, enqueued_at = self._queue.popleft()
+                self._in_flight += 1
+                self.last_wait = time.monotonic() - enqueued_at
+                self.max_wait = max(self.max_wait, self.last_wait)
+                self.total_wait += self.last_wait
+            failed = False
+            try:
+                prepared = self.prepare(event)
+                with self._condition:
+                    while self._turn != sequence:
+                        self._condition.wait()
+                self.process(event, prepared)
+            except Exception:
+                failed = True
+                logger.exception(f"Unhandled exception occurred while processing {event}!")
+            with self._condition:
+                self._skip(sequence)
+                self._in_flight -= 1
+                self.processed += 1
+                self.failed += failed
+            if failed:
+                self._report_drop(event)
+
+    def stats(self):
+        with self._condition:
+            started = self.processed + self._in_flight
+            return {
+                "queue_depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "processed": self.processed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "last_wait": self.last_wait,
+                "max_wait": self.max_wait,
+                "average_wait": self.total_wait / started if started else None,
+            }
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from config.env_config import settings
+from src.utils.AsyncAASManager import AsyncAASManager
+from src.utils.AASRegistry import get_registry
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+
+class InspectionPlanCache:
+    """
+    InspectionPlanCache Class
+
+    The `InspectionPlanCache` class keeps a warm cache of the inspection plans of all idShorts in the AAS registry.
+    The plans are prefetched concurrently and refreshed periodically in a background thread, so that the RFID path
+    can read the plan of a vehicle from memory instead of fetching it from the AAS after the tag was read.
+
+    Attributes:
+        refresh_interval (float): Time in seconds between two prefetch runs.
+        hits (int): Number of plans served from the cache.
+        misses (int): Number of lookups that were not in the cache.
+        refreshed_at (float): Monotonic timestamp of the last prefetch run, or None.
+
+    Methods:
+        start(self):
+            Starts the background prefetch thread.
+
+        stop(self):
+            Stops the background prefetch thread.
+
+        refresh(self):
+            Fetches the plans of all idShorts of the registry concurrently and updates the cache.
+
+        get(self, auto_id):
+            Returns the cached plan of an auto_id or None.
+
+        get_version(self, auto_id):
+            Returns the version of the cached plan, which is incremented whenever the plan changes.
+
+        put(self, auto_id, inspection_plan):
+            Stores a plan that was fetched elsewhere.
+
+        invalidate(self, auto_id=None):
+            Removes the plan of one auto_id or all plans from the cache.
+
+        stats(self):
+            Returns the hit and miss counts and the number of cached plans.
+
+    Usage:
+        inspection_plan_cache.start()
+        inspection_plan = inspection_plan_cache.get("BMW_X7")
+    """
+
+    def __init__(self, refresh_interval=settings.plan_prefetch_interval):
+        self.refresh_interval = refresh_interval
+        self.hits = 0
+        self.misses = 0
+        self.refreshed_at = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to prefetch the inspection plans: {e}")
+            self._stop_event.wait(self.refresh_interval)
+
+    def refresh(self):
+        """
+        Fetch the plans of all idShorts of the registry concurrently and update the cache.
+        Plans of idShorts that are no longer registered are removed, failed fetches keep the cached plan.
+        """
+        registry = get_registry()
+        registry_refreshed = registry.refresh()
+        auto_ids = registry.get_all_idShorts()
+        plans = asyncio.run(self._fetch_all(auto_ids))
+        with self._lock:
+            if registry_refreshed:
+                for auto_id in list(self._entries):
+                    if auto_id not in plans:
+                        del self._entries[auto_id]
+            for auto_id, inspection_plan in plans.items():
+                if inspection_plan is not None:
+                    self._store(auto_id, inspection_plan)
+        self.refreshed_at = time.monotonic()
+        logger.info(f"Prefetched {len(self._entries)} inspection plans")
+
+    @staticmethod
+    async def _fetch_all(auto_ids):
+        async with AsyncAASManager(logger_on=False) as aas_manager:
+            return await aas_manager.get_inspection_plans(auto_ids)
+
+    def get(self, auto_id):
+        with self._lock:
+            entry = self._entries.get(auto_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def get_version(self, auto_id):
+        entry = self._entries.get(auto_id)
+        return entry[0] if entry else None
+
+    def put(self, auto_id, inspection_plan):
+        with self._lock:
+            self._store(auto_id, inspection_plan)
+
+    def _store(self, auto_id, inspection_plan):
+        entry = self._entries.get(auto_id)
+        if entry is None:
+            self._entries[auto_id] = (1, inspection_plan)
+        elif entry[1] != inspection_plan:
+            self._entries[auto_id] = (entry[0] + 1, inspection_plan)
+
+    def invalidate(self, auto_id=None):
+        with self._lock:
+            if auto_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(auto_id, None)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+inspection_plan_cache = InspectionPlanCache()
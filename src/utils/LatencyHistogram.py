@@ -0,0 +1,97 @@
+import bisect
+import threading
+from config.env_config import settings
+
+
+class LatencyHistogram:
+    """
+    LatencyHistogram Class
+
+    The `LatencyHistogram` class records latencies in logarithmic buckets and answers percentile queries in
+    O(buckets), with constant memory. To follow changes of the latency, all counts are halved whenever the number
+    of recorded samples reaches `window`, so older samples fade out.
+
+    Attributes:
+        bounds (list): Upper bounds of the buckets in seconds, growing by `growth` from `min_latency`.
+        window (int): Number of samples after which the counts are halved.
+        count (float): Number of samples currently weighing in the histogram.
+
+    Methods:
+        record(self, latency):
+            Records a latency in seconds.
+
+        percentile(self, p):
+            Returns the upper bound of the bucket that contains the p-th percentile, or None without samples.
+
+        stats(self):
+            Returns the sample count and the p50, p95 and p99 latencies.
+
+    Usage:
+        histogram = LatencyHistogram()
+        histogram.record(0.120)
+        p99 = histogram.percentile(99)
+    """
+
+    def __init__(self, min_latency=0.001, max_latency=30.0, growth=1.2, window=512):
+        self.bounds = []
+        bound = min_latency
+        while bound < max_latency:
+            self.bounds.append(bound)
+            bound *= growth
+        self.bounds.append(max_latency)
+        self.window = window
+        self.count = 0.0
+        self._counts = [0.0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, latency)] += 1
+            self.count += 1
+            if self.count >= self.window:
+                self._counts = [count / 2 for count in self._counts]
+                self.count /= 2
+
+    def percentile(self, p):
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = self.count * p / 100
+            cumulative = 0.0
+            for index, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= rank and count > 0:
+                    return self.bounds[min(index, len(self.bounds) - 1)]
+            return self.bounds[-1]
+
+    def stats(self):
+        return {"count": int(self.count), "p50": self.percentile(50), "p95": self.percentile(95),
+                "p99": self.percentile(99)}
+
+
+def get_adaptive_timeout(histograms):
+    """
+    Timeout derived from the p99 reply latency of the slowest camera, multiplied by `camera_timeout_factor` and
+    limited to [`camera_timeout_min`, `camera_timeout_max`]. Until every camera has `camera_latency_min_samples`
+    replies, `camera_timeout_max` is used.
+    :param histograms: The `LatencyHistogram` of every camera.
+    :return: The timeout in seconds.
+    """
+    p99_latencies = []
+    for histogram in histograms:
+        if histogram.count < settings.camera_latency_min_samples:
+            return settings.camera_timeout_max
+        p99_latencies.append(histogram.percentile(99))
+    timeout = max(p99_latencies) * settings.camera_timeout_factor
+    return min(max(timeout, settings.camera_timeout_min), settings.camera_timeout_max)
+
+
+def get_hedge_delay(histogram):
+    """
+    Delay after which a camera that hasn't replied is triggered a second time: its p95 reply latency.
+    :param histogram: The `LatencyHistogram` of the camera.
+    :return: The delay in seconds, or None until the camera has `camera_latency_min_samples` replies.
+    """
+    if histogram.count < settings.camera_latency_min_samples:
+        return None
+    return histogram.percentile(95)
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from config.env_config import settings
+
+
+class RFIDDebouncer:
+    """
+    RFIDDebouncer Class
+
+    The `RFIDDebouncer` class suppresses repeated reads of the same RFID tag, so that a reader republishing the tag
+    while a car sits in the station doesn't trigger the cameras and the AAS upload again for every read.
+
+    A read is accepted if its tag wasn't read within the last `window` seconds. Every read of a tag, accepted or
+    suppressed, restarts its window, so a tag stays suppressed as long as it keeps being republished and is accepted
+    again once it was quiet for `window` seconds. Other tags are not affected, so a new vehicle is never suppressed by
+    the previous one. The time of the last read is kept for the `max_tags` most recently read tags (LRU); a tag that
+    was evicted counts as new.
+
+    Attributes:
+        window (float): Seconds after the last read of a tag within which another read is suppressed.
+        max_tags (int): Maximum number of remembered tags.
+        accepted (int): Number of accepted reads.
+        suppressed (int): Number of suppressed reads.
+
+    Methods:
+        accept(self, rfid):
+            Records a read of a tag.
+            :return: True if the read should be processed, False if it is a repeat within the window.
+
+        forget(self, rfid):
+            Forgets a tag, so that its next read is accepted, e.g. if its accepted read couldn't be processed.
+
+        stats(self):
+            Returns the number of remembered tags and the counters.
+
+    Usage:
+        debouncer = RFIDDebouncer(window=5)
+        if debouncer.accept("ANT1E00401002085C43D8"):
+            dispatcher.submit("ANT1E00401002085C43D8")
+    """
+
+    def __init__(self, window=settings.rfid_debounce_window, max_tags=settings.rfid_debounce_cache_size):
+        self.window = window
+        self.max_tags = max_tags
+        self.accepted = 0
+        self.suppressed = 0
+        self._last_read = OrderedDict()
+        self._lock = threading.Lock()
+
+    def accept(self, rfid):
+        now = time.monotonic()
+        with self._lock:
+            last_read = self._last_read.pop(rfid, None)
+            self._last_read[rfid] = now
+            if len(self._last_read) > self.max_tags:
+                self._last_read.popitem(last=False)
+            if last_read is not None and now - last_read < self.window:
+                self.suppressed += 1
+                return False
+            self.accepted += 1
+            return True
+
+    def forget(self, rfid):
+        with self._lock:
+            self._last_read.pop(rfid, None)
+
+    def stats(self):
+        with self._lock:
+            return {"tags": len(self._last_read), "accepted": self.accepted, "suppressed": self.suppressed}
@@ -0,0 +1,132 @@
+import threading
+import time
+from config.env_config import settings
+from src.utils.AASRegistry import get_registry
+from src.utils.CarRegistry import normalize_auto_id
+from src.utils.util_config_cars import get_normalized_auto_ids, update_car_data, remove_car_data
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+
+class RegistrySync:
+    """
+    RegistrySync Class
+
+    The `RegistrySync` class keeps the cars configuration in line with the AAS registry in a background thread, so
+    that the dashboard doesn't have to download the registry and compare it with the configuration on every page
+    view. Each run diffs the normalized idShorts of the registry snapshot against the normalized auto IDs of the
+    configuration and only applies the differences: new idShorts are added, and idShorts that were in the registry
+    at an earlier sync are removed once they have been missing for `missing_syncs` consecutive syncs, so a shell
+    that drops out of one listing (e.g. during a restart of the registry) keeps its RFID assignment. Cars that were
+    configured by hand and never appeared in the registry are left alone. A run is skipped if the registry couldn't
+    be refreshed, so an unreachable AAS never empties the configuration.
+
+    Attributes:
+        interval (float): Time in seconds between two sync runs.
+        missing_syncs (int): Number of consecutive syncs an idShort must be missing from the registry to be removed.
+        synced_at (float): Unix timestamp of the last successful sync, or None.
+        registry_version (int): Version of the registry snapshot of the last successful sync, or None.
+        added (int): Number of cars added by the last successful sync.
+        removed (int): Number of cars removed by the last successful sync.
+
+    Methods:
+        start(self):
+            Starts the background sync thread.
+
+        stop(self):
+            Stops the background sync thread.
+
+        sync(self):
+            Refreshes the registry snapshot and applies its additions and removals to the cars configuration.
+
+        status(self):
+            Returns the watermark of the last successful sync, with the time formatted for display.
+
+    Usage:
+        registry_sync.start()
+        status = registry_sync.status()
+    """
+
+    def __init__(self, interval=settings.registry_sync_interval, missing_syncs=settings.registry_sync_missing_syncs):
+        self.interval = interval
+        self.missing_syncs = max(1, missing_syncs)
+        self.synced_at = None
+        self.registry_version = None
+        self.added = 0
+        self.removed = 0
+        self._registered = None
+        self._missed_syncs = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Failed to sync the cars configuration with the AAS registry: {e}")
+            self._stop_event.wait(self.interval)
+
+    def sync(self):
+        """
+        Refresh the registry snapshot and apply its differences to the cars configuration.
+        :return: True if the sync was successful, False if the registry couldn't be refreshed.
+        """
+        with self._lock:
+            registry = get_registry()
+            if not registry.refresh():
+                return False
+            registered = {normalize_auto_id(id_short): id_short for id_short in registry.get_all_idShorts()}
+            known = get_normalized_auto_ids()
+            added = [id_short for normalized, id_short in registered.items() if normalized not in known]
+            removed = []
+            missed_syncs = {}
+            for normalized, id_short in (self._registered or {}).items():
+                if normalized in registered or normalized not in known:
+                    continue
+                missed = self._missed_syncs.get(normalized, 0) + 1
+                if missed >= self.missing_syncs:
+                    removed.append(id_short)
+                else:
+                    missed_syncs[normalized] = missed
+                    logger.info(f"{id_short} is missing from the AAS registry ({missed} of {self.missing_syncs} "
+                                f"syncs before it is removed)")
+            if added:
+                update_car_data(added)
+            if removed:
+                remove_car_data(removed)
+                for id_short in removed:
+                    logger.warning(f"Removed {id_short} from the cars configuration, it was missing from the AAS "
+                                   f"registry for {self.missing_syncs} consecutive syncs")
+            # idShorts that are missing but not removed yet are kept, so their misses keep being counted
+            self._registered = {**registered, **{normalized: self._registered[normalized]
+                                                 for normalized in missed_syncs}}
+            self._missed_syncs = missed_syncs
+            self.registry_version = registry.version
+            self.synced_at = time.time()
+            self.added = len(added)
+            self.removed = len(removed)
+            if added or removed:
+                logger.info(f"Synced the cars configuration with the AAS registry: "
+                            f"{len(added)} added, {len(removed)} removed")
+            return True
+
+    def status(self):
+        synced_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.synced_at)) if self.synced_at else None
+        return {"synced_at": synced_at, "registry_version": self.registry_version,
+                "added": self.added, "removed": self.removed}
+
+
+registry_sync = RegistrySync()
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+from config.env_config import settings
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+
+class ResponseUploader:
+    """
+    ResponseUploader Class
+
+    The `ResponseUploader` class puts inspection responses into the AAS in the background (write-behind), so that the
+    OPC UA data change callback only has to enqueue a response instead of waiting for a slow AAS host.
+
+    Responses are coalesced per auto_id: if a newer response for the same auto_id arrives before the older one was
+    uploaded, only the newest one is uploaded. Uploads of the same auto_id never run concurrently.
+
+    Attributes:
+        aas_manager (AASManager): The AAS manager used to put the responses.
+        max_queue_size (int): Maximum number of auto_ids waiting for an upload, further responses are rejected.
+        worker_count (int): Number of upload worker threads.
+        max_retries (int): Number of retries of a failed upload.
+        retry_backoff (float): Base backoff in seconds, doubled after every failed attempt.
+        uploaded (int): Number of successful uploads.
+        failed (int): Number of uploads that failed after all retries.
+        retried (int): Number of retried upload attempts.
+        coalesced (int): Number of responses that replaced an older, not yet uploaded response.
+        rejected (int): Number of responses rejected because the queue was full.
+
+    Methods:
+        start(self):
+            Starts the worker threads.
+
+        stop(self, timeout=5):
+            Uploads the queued responses and stops the worker threads.
+
+        submit(self, auto_id, inspection_response):
+            Enqueues a response for upload.
+            :return: True if the response was accepted, False if the queue is full.
+
+        stats(self):
+            Returns the queue depth, upload latency and the counters.
+
+    Usage:
+        uploader = ResponseUploader(AASManager())
+        uploader.start()
+        uploader.submit("BMW_X7", inspection_response)
+    """
+
+    def __init__(self, aas_manager, max_queue_size=settings.upload_queue_size, worker_count=settings.upload_workers,
+                 max_retries=settings.upload_max_retries, retry_backoff=settings.upload_retry_backoff):
+        self.aas_manager = aas_manager
+        self.max_queue_size = max_queue_size
+        self.worker_count = worker_count
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.uploaded = 0
+        self.failed = 0
+        self.retried = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+        self._pending = {}
+        self._in_flight = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def start(self):
+        if any(worker.is_alive() for worker in self._workers):
+            return
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(self.worker_count)]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self, timeout=5):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def submit(self, auto_id, inspection_response):
+        with self._lock:
+            if auto_id in self._pending:
+                self.coalesced += 1
+                self._pending[auto_id] = (inspection_response, time.monotonic())
+                return True
+            if len(self._pending) >= self.max_queue_size:
+                self.rejected += 1
+                logger.warning(f"Upload queue is full, inspection response for {auto_id} was rejected")
+                return False
+            self._pending[auto_id] = (inspection_response, time.monotonic())
+            if auto_id not in self._in_flight:
+                # An upload in flight re-enqueues the auto_id itself when it is done
+                self._queue.put(auto_id)
+            return True
+
+    def _run(self):
+        while True:
+            auto_id = self._queue.get()
+            if auto_id is None:
+                break
+            with self._lock:
+                inspection_response, enqueued_at = self._pending.pop(auto_id)
+                self._in_flight.add(auto_id)
+            try:
+                self._upload(auto_id, inspection_response, enqueued_at)
+            finally:
+                with self._lock:
+                    self._in_flight.discard(auto_id)
+                    if auto_id in self._pending:
+                        self._queue.put(auto_id)
+
+    def _upload(self, auto_id, inspection_response, enqueued_at):
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                if auto_id in self._pending:
+                    # A newer response replaces this one, no need to retry
+                    return
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            if self.aas_manager.put_inspection_response(auto_id, inspection_response):
+                with self._lock:
+                    self.uploaded += 1
+                    self.last_latency = time.monotonic() - enqueued_at
+                    self.total_latency += self.last_latency
+                return
+        with self._lock:
+            self.failed += 1
+        logger.error(f"Inspection response for {auto_id} couldn't be put into the AAS after "
+                     f"{self.max_retries + 1} attempts")
+
+    def stats(self):
+        return {
+            "queue_depth": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "uploaded": self.uploaded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "last_latency": self.last_latency,
+            "average_latency": self.total_latency / self.uploaded if self.uploaded else None,
+        }
@@ -0,0 +1,42 @@
+import asyncio
+
+
+class AsyncSingleFlight:
+    """
+    AsyncSingleFlight Class
+
+    The `AsyncSingleFlight` class deduplicates concurrent identical calls: while a call for a key is in flight on an
+    event loop, further coroutines on that loop with the same key await its task and share its result (or its
+    exception) instead of starting their own.
+
+    Attributes:
+        shared (int): Number of calls that were answered by a call already in flight.
+
+    Methods:
+        do(self, key, coroutine_fn, *args, **kwargs):
+            Awaits coroutine_fn(*args, **kwargs) unless a call for the key is already in flight, and returns its result.
+
+    Usage:
+        inspection_plan = await aas_single_flight.do(("plan", auto_id), fetch_plan, auto_id)
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._tasks = {}
+
+    async def do(self, key, coroutine_fn, *args, **kwargs):
+        # A task can only be awaited on its own event loop
+        key = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(coroutine_fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shielded, so that a cancelled caller doesn't cancel the fetch of the other callers
+        return await asyncio.shield(task)
+
+
+# Shared by all AAS managers, so that the lookups of the Flask app and the OPC UA subscriber are deduplicated together
+aas_single_flight = AsyncSingleFlight()
@@ -0,0 +1,228 @@
+import json
+import sqlite3
+import threading
+from src.utils.CarRegistry import normalize_auto_id
+from src.utils.Logger import SingletonLogger
+
+logger = SingletonLogger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL UNIQUE,
+    auto_id TEXT,
+    normalized_auto_id TEXT,
+    rfid TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vehicles_rfid ON vehicles (rfid);
+CREATE INDEX IF NOT EXISTS idx_vehicles_auto_id ON vehicles (auto_id);
+CREATE INDEX IF NOT EXISTS idx_vehicles_normalized_auto_id ON vehicles (normalized_auto_id);
+"""
+
+
+class SQLiteVehicleStore:
+    """
+    SQLiteVehicleStore Class
+
+    The `SQLiteVehicleStore` class is a transactional alternative to the cars_config.json file. Vehicles are stored
+    in a SQLite database in WAL mode with indexed RFID and auto ID columns, so that changes are single-row upserts
+    instead of rewrites of the whole file, and concurrent dashboard requests cannot lose each other's updates.
+    It provides the same methods as `CarRegistry` and is selected with VEHICLE_STORE=sqlite.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+
+    Methods:
+        import_json(self, json_path):
+            Imports a cars_config.json file once, if the store is still empty.
+
+        get_cars(self):
+            Returns all vehicles in the cars configuration format.
+
+        get_auto_id(self, rfid):
+            Returns the auto ID of an RFID.
+
+        get_car_name(self, auto_id):
+            Returns the model name of an auto ID.
+
+        get_rfid(self, auto_id):
+            Returns the RFID of an auto ID.
+
+        normalized_auto_ids(self):
+            Returns the set of normalized auto IDs.
+
+        add_cars(self, auto_id_list):
+            Adds the auto IDs that are not in the store yet.
+
+        remove_cars(self, auto_id_list):
+            Removes the vehicles of the given auto IDs.
+
+        set_rfid(self, auto_id, new_rfid):
+            Sets the RFID of an auto ID.
+
+        set_rfids(self, mapping):
+            Sets the RFIDs of several auto IDs in one transaction.
+
+        save_cars(self, data):
+            Replaces all vehicles with the given cars configuration.
+
+    Usage:
+        store = SQLiteVehicleStore(settings.vehicle_db_path)
+        store.import_json(cars_config_json_path)
+        auto_id = store.get_auto_id("ANT1E00401002085C43D8")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def import_json(self, json_path):
+        """
+        Imports a cars_config.json file, if the store doesn't contain any vehicles yet.
+        :param json_path: Path of the cars configuration JSON file.
+        :return: True if the file was imported, otherwise False.
+        """
+        connection = self._connect()
+        if connection.execute("SELECT 1 FROM vehicles LIMIT 1").fetchone():
+            return False
+        try:
+            with open(json_path, 'r') as file:
+                data = json.load(file)
+        except (IOError, json.JSONDecodeError) as e:
+            logger.error(f'Failed to import cars_config file on {str(json_path)}: {e}')
+            return False
+        imported = self.save_cars(data)
+        if imported:
+            logger.info(f'Imported {len(data)} cars from {str(json_path)} into {str(self.path)}')
+        return imported
+
+    def get_cars(self):
+        rows = self._connect().execute("SELECT model, rfid, auto_id FROM vehicles ORDER BY id").fetchall()
+        return {model: [{"RFID": rfid}, {"AutoID": auto_id}] for model, rfid, auto_id in rows}
+
+    def get_auto_id(self, rfid):
+        row = self._connect().execute("SELECT auto_id FROM vehicles WHERE rfid IS ? ORDER BY id LIMIT 1",
+                                      (rfid,)).fetchone()
+        return row[0] if row else None
+
+    def get_car_name(self, auto_id):
+        row = self._connect().execute("SELECT model FROM vehicles WHERE auto_id = ? ORDER BY id LIMIT 1",
+                                      (auto_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_rfid(self, auto_id):
+        row = self._connect().execute("SELECT rfid FROM vehicles WHERE auto_id = ? ORDER BY id LIMIT 1",
+                                      (auto_id,)).fetchone()
+        return row[0] if row else None
+
+    def normalized_auto_ids(self):
+        rows = self._connect().execute("SELECT normalized_auto_id FROM vehicles").fetchall()
+        return {row[0] for row in rows}
+
+    def add_cars(self, auto_id_list):
+        """
+        Adds the auto IDs that are not in the store yet, compared by their normalized form.
+        :param auto_id_list: List of auto IDs.
+        :return: True if cars were added, None if nothing changed.
+        """
+        connection = self._connect()
+        data_changed = False
+        with connection:
+            for auto_id in auto_id_list:
+                normalized_auto_id = normalize_auto_id(auto_id)
+                if connection.execute("SELECT 1 FROM vehicles WHERE normalized_auto_id = ?",
+                                      (normalized_auto_id,)).fetchone():
+                    continue
+                self._upsert(connection, auto_id.replace('_', ' '), auto_id, None)
+                data_changed = True
+                logger.info(f'Car {auto_id} added to the vehicle store')
+        return True if data_changed else None
+
+    def remove_cars(self, auto_id_list):
+        """
+        Removes the vehicles of the given auto IDs, compared by their normalized form.
+        :param auto_id_list: List of auto IDs.
+        :return: True if vehicles were removed, None if nothing changed.
+        """
+        connection = self._connect()
+        with connection:
+            cursor = connection.executemany("DELETE FROM vehicles WHERE normalized_auto_id = ?",
+                                            [(normalize_auto_id(auto_id),) for auto_id in auto_id_list])
+        if cursor.rowcount > 0:
+            logger.info(f'Removed {cursor.rowcount} cars from the vehicle store')
+            return True
+        return None
+
+    def set_rfid(self, auto_id, new_rfid):
+        """
+        Sets the RFID of an auto ID.
+        :param auto_id: The auto ID whose RFID needs to be updated.
+        :param new_rfid: The new RFID.
+        :return: True if the RFID is updated successfully; False otherwise.
+        """
+        connection = self._connect()
+        with connection:
+            cursor = connection.execute("UPDATE vehicles SET rfid = ? WHERE auto_id = ?", (new_rfid, auto_id))
+        if cursor.rowcount == 0:
+            logger.warning(f"AutoID {auto_id} not found in the vehicle store. Couldn\'t set the new rfid!")
+            return False
+        return True
+
+    def set_rfids(self, mapping):
+        """
+        Sets the RFIDs of several auto IDs in one transaction. Nothing is changed if one of the auto IDs is unknown.
+        :param mapping: Dictionary of auto ID to new RFID.
+        :return: True if the RFIDs are updated successfully; False otherwise.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                for auto_id, new_rfid in mapping.items():
+                    cursor = connection.execute("UPDATE vehicles SET rfid = ? WHERE auto_id = ?", (new_rfid, auto_id))
+                    if cursor.rowcount == 0:
+                        raise KeyError(auto_id)
+        except KeyError as e:
+            logger.warning(f"AutoID {e.args[0]} not found in the vehicle store. Couldn\'t set the new rfids!")
+            return False
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to write to the vehicle store: {e}')
+            return False
+        return True
+
+    def save_cars(self, data):
+        """
+        Replaces all vehicles with the given cars configuration in one transaction.
+        :param data: The car configuration data to save.
+        :return: True if data is successfully written; False otherwise.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM vehicles")
+                for model, details in data.items():
+                    auto_id = next((d.get('AutoID') for d in details if 'AutoID' in d), None)
+                    rfid = next((d.get('RFID') for d in details if 'RFID' in d), None)
+                    self._upsert(connection, model, auto_id, rfid)
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to write to the vehicle store: {e}')
+            return False
+        return True
+
+    @staticmethod
+    def _upsert(connection, model, auto_id, rfid):
+        connection.execute(
+            "INSERT INTO vehicles (model, auto_id, normalized_auto_id, rfid) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(model) DO UPDATE SET auto_id = excluded.auto_id, "
+            "normalized_auto_id = excluded.normalized_auto_id, rfid = excluded.rfid",
+            (model, auto_id, normalize_auto_id(auto_id), rfid))
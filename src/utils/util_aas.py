@@ -1,4 +1,7 @@
 import base64
+import codecs
+import json
+import re
 
 
 def encode_to_base64(original_string: str):
@@ -23,3 +26,91 @@ def encode_to_base64(original_string: str):
     base64_bytes = base64.b64encode(string_bytes)
     base64_string = base64_bytes.decode('utf-8')
     return base64_string
+
+
+class JSONArrayStreamParser:
+    """
+    Incrementally parses a JSON document and yields the items of one top-level array while the document is still
+    being received, so that large AAS registry pages never have to be held in memory as a whole.
+
+    The rest of the document (e.g. 'paging_metadata') is returned by `close()` with the array replaced by an empty
+    list.
+
+    Args:
+        key (str): Key of the array whose items are yielded, defaults to 'result'.
+
+    Example:
+        parser = JSONArrayStreamParser("result")
+        for chunk in response.iter_content(chunk_size=8192):
+            for item in parser.feed(chunk):
+                print(item["idShort"])
+        metadata = parser.close()
+    """
+
+    def __init__(self, key="result"):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buffer = ""
+        self._head = None
+        self._tail = None
+
+    def feed(self, chunk):
+        """
+        Adds the next chunk of the document.
+        :param chunk: Bytes or text of the document.
+        :return: List of the array items that were completed by this chunk.
+        """
+        if isinstance(chunk, bytes):
+            chunk = self._text_decoder.decode(chunk)
+        if self._tail is not None:
+            self._tail.append(chunk)
+            return []
+        self._buffer += chunk
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Finishes the document.
+        :return: The document without the array items.
+        """
+        if self._tail is None:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            self._parse(final=True)
+        if self._head is None:
+            return json.loads(self._buffer) if self._buffer.strip() else {}
+        return json.loads(self._head + "]" + "".join(self._tail))
+
+    def _parse(self, final):
+        items = []
+        if self._head is None:
+            match = self._array_start.search(self._buffer)
+            if match is None:
+                return items
+            self._head = self._buffer[:match.end()]
+            self._buffer = self._buffer[match.end():]
+        position = 0
+        length = len(self._buffer)
+        while True:
+            while position < length and self._buffer[position] in " \t\r\n,":
+                position += 1
+            if position == length:
+                break
+            if self._buffer[position] == "]":
+                self._tail = [self._buffer[position + 1:]]
+                position = length
+                break
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            if not final and (end == length or self._buffer[end] not in " \t\r\n,]"):
+                # An item is only complete once a delimiter follows it: "1500." of "1500.0" or "1e" of "1e3" decode
+                # as a number that continues in the next chunk
+                break
+            items.append(item)
+            position = end
+        self._buffer = self._buffer[position:]
+        return items
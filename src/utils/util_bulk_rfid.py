@@ -0,0 +1,206 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from src.utils.AASRegistry import get_registry
+from src.utils.CarRegistry import normalize_auto_id
+from src.utils.util_config_cars import get_auto_id, get_car_name, set_car_rfids
+
+
+def parse_rfid_csv(text):
+    """
+    Parses a CSV mapping of auto IDs to RFIDs.
+
+    The CSV has two columns, auto ID and RFID. A header row with the column names 'AutoID' and 'RFID' is optional;
+    if present, the columns may be in any order. Empty lines are skipped.
+
+    Args:
+        text (str): The CSV content.
+
+    Returns:
+        list of tuple: The (auto ID, RFID) rows in file order.
+
+    Raises:
+        ValueError: If the content is not valid CSV.
+
+    Example:
+        rows = parse_rfid_csv("AutoID,RFID\\nBMW_X7,ANT1E00401002085C43D8\\n")
+    """
+    reader = csv.reader(io.StringIO(text))
+    try:
+        rows = [[cell.strip() for cell in row] for row in reader if any(cell.strip() for cell in row)]
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV in line {reader.line_num}: {e}") from e
+    auto_id_column, rfid_column = 0, 1
+    if rows and {"autoid", "rfid"} <= {cell.lower() for cell in rows[0]}:
+        header = [cell.lower() for cell in rows.pop(0)]
+        auto_id_column, rfid_column = header.index("autoid"), header.index("rfid")
+    return [(row[auto_id_column] if len(row) > auto_id_column else "",
+             row[rfid_column] if len(row) > rfid_column else "") for row in rows]
+
+
+def parse_rfid_json(text):
+    """
+    Parses a JSON mapping of auto IDs to RFIDs.
+
+    Both an object of auto ID to RFID and a list of objects with the keys 'AutoID' and 'RFID' are accepted.
+    Only the list form can contain the same auto ID twice, which is then reported as a conflict.
+
+    Args:
+        text (str): The JSON content.
+
+    Returns:
+        list of tuple: The (auto ID, RFID) rows in document order.
+
+    Raises:
+        ValueError: If the content is not valid JSON or has neither of the accepted forms.
+
+    Example:
+        rows = parse_rfid_json('{"BMW_X7": "ANT1E00401002085C43D8"}')
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        return [(str(auto_id), "" if rfid is None else str(rfid)) for auto_id, rfid in data.items()]
+    if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        return [(str(item.get("AutoID", "")), "" if item.get("RFID") is None else str(item.get("RFID")))
+                for item in data]
+    raise ValueError("Expected an object of AutoID to RFID or a list of {'AutoID': ..., 'RFID': ...} objects")
+
+
+def parse_rfid_mapping(text, file_format):
+    """
+    Parses a CSV or JSON mapping of auto IDs to RFIDs.
+
+    Args:
+        text (str): The file content.
+        file_format (str): 'csv' or 'json'.
+
+    Returns:
+        list of tuple: The (auto ID, RFID) rows.
+
+    Raises:
+        ValueError: If the format is unknown or the content can't be parsed.
+
+    Example:
+        rows = parse_rfid_mapping(content, "csv")
+    """
+    if file_format == "csv":
+        return parse_rfid_csv(text)
+    if file_format == "json":
+        return parse_rfid_json(text)
+    raise ValueError(f"Unknown format {file_format}, expected 'csv' or 'json'")
+
+
+def validate_rfid_mapping(rows, check_registry=True):
+    """
+    Validates (auto ID, RFID) rows before they are assigned.
+
+    A row is a conflict if its auto ID or RFID is empty, its auto ID is not in the car configuration or (with
+    `check_registry`) not in the AAS registry, its auto ID appears twice with different RFIDs, its RFID is given to
+    more than one auto ID, or its RFID already belongs to a car that keeps it after the import. Every lookup is a
+    hash lookup, so the validation is linear in the number of rows.
+
+    Args:
+        rows (list of tuple): The (auto ID, RFID) rows.
+        check_registry (bool): Whether the auto IDs must be registered in the AAS registry.
+
+    Returns:
+        tuple: The mapping of auto ID to RFID and the list of conflicts, each a dictionary with 'row', 'AutoID',
+            'RFID' and 'reason'.
+
+    Example:
+        mapping, conflicts = validate_rfid_mapping(parse_rfid_csv(content))
+    """
+    conflicts = []
+    registered = None
+    if check_registry:
+        registry = get_registry()
+        id_shorts = registry.get_all_idShorts()
+        if registry.loaded_at is None:
+            conflicts.append({"row": None, "AutoID": None, "RFID": None, "reason": "AAS registry is unavailable"})
+            return {}, conflicts
+        registered = {normalize_auto_id(id_short) for id_short in id_shorts}
+
+    def conflict(row_number, auto_id, rfid, reason):
+        conflicts.append({"row": row_number, "AutoID": auto_id, "RFID": rfid, "reason": reason})
+
+    mapping = {}
+    rfid_owners = {}
+    for row_number, (auto_id, rfid) in enumerate(rows, start=1):
+        if not auto_id or not rfid:
+            conflict(row_number, auto_id, rfid, "AutoID and RFID are required")
+        elif get_car_name(auto_id) is None:
+            conflict(row_number, auto_id, rfid, "AutoID is not in the car configuration")
+        elif registered is not None and normalize_auto_id(auto_id) not in registered:
+            conflict(row_number, auto_id, rfid, "AutoID is not in the AAS registry")
+        elif auto_id in mapping and mapping[auto_id] != rfid:
+            conflict(row_number, auto_id, rfid, f"AutoID was already given the RFID {mapping[auto_id]}")
+        elif rfid in rfid_owners and rfid_owners[rfid] != auto_id:
+            conflict(row_number, auto_id, rfid, f"RFID was already given to {rfid_owners[rfid]}")
+        else:
+            mapping[auto_id] = rfid
+            rfid_owners[rfid] = auto_id
+    for rfid, auto_id in rfid_owners.items():
+        current_owner = get_auto_id(rfid)
+        if current_owner is not None and current_owner != auto_id and current_owner not in mapping:
+            conflict(None, auto_id, rfid, f"RFID is already assigned to {current_owner}")
+    return mapping, conflicts
+
+
+def import_rfid_mapping(rows, check_registry=True, dry_run=False):
+    """
+    Validates (auto ID, RFID) rows and assigns them in one transaction.
+
+    The import is all or nothing: if any row is a conflict, no RFID is changed and the conflicts are reported.
+    If the valid mapping can't be saved, no RFID is changed either and the report carries an 'error'.
+
+    Args:
+        rows (list of tuple): The (auto ID, RFID) rows.
+        check_registry (bool): Whether the auto IDs must be registered in the AAS registry.
+        dry_run (bool): Only validate the rows without assigning them.
+
+    Returns:
+        dict: A report with the number of 'rows', the number of 'applied' assignments, the 'conflicts' and, if
+            saving failed, the 'error'.
+
+    Example:
+        report = import_rfid_mapping(parse_rfid_mapping(content, "json"))
+    """
+    mapping, conflicts = validate_rfid_mapping(rows, check_registry)
+    report = {"rows": len(rows), "applied": 0, "conflicts": conflicts}
+    if conflicts or dry_run or not mapping:
+        return report
+    if set_car_rfids(mapping):
+        report["applied"] = len(mapping)
+    else:
+        report["error"] = "Failed to save the RFIDs"
+    return report
+
+
+def main(argv=None):
+    """
+    Command line interface for the bulk RFID import.
+
+    Example:
+        python -m src.utils.util_bulk_rfid vehicles.csv
+        python -m src.utils.util_bulk_rfid vehicles.json --dry-run --no-registry-check
+    """
+    parser = argparse.ArgumentParser(description="Assign the RFIDs of many vehicles from a CSV or JSON file.")
+    parser.add_argument("file", help="CSV (AutoID,RFID) or JSON file with the mapping of AutoID to RFID")
+    parser.add_argument("--format", choices=("csv", "json"),
+                        help="format of the file, by default derived from the file extension")
+    parser.add_argument("--dry-run", action="store_true", help="only validate the file")
+    parser.add_argument("--no-registry-check", action="store_true",
+                        help="don't require the AutoIDs to be registered in the AAS registry")
+    args = parser.parse_args(argv)
+    file_format = args.format or ("json" if args.file.lower().endswith(".json") else "csv")
+    with open(args.file, "r", encoding="utf-8-sig") as file:
+        rows = parse_rfid_mapping(file.read(), file_format)
+    report = import_rfid_mapping(rows, check_registry=not args.no_registry_check, dry_run=args.dry_run)
+    print(json.dumps(report, indent=4))
+    return 1 if report["conflicts"] or report.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,25 @@
 import os
-import json
 from config.env_config import settings
+from src.utils.CarRegistry import CarRegistry
+from src.utils.VehicleStore import SQLiteVehicleStore
 from src.utils.Logger import SingletonLogger
 
 cars_config_json_path = os.path.join(settings.config_path, 'cars_config.json')
 logger = SingletonLogger()
 
+if settings.vehicle_store == "sqlite":
+    car_registry = SQLiteVehicleStore(settings.vehicle_db_path)
+    car_registry.import_json(cars_config_json_path)
+else:
+    car_registry = CarRegistry(cars_config_json_path)
+
 
 def get_cars_json():
     """
     Retrieves the cars configuration data from a JSON file specified by the configuration path.
 
-    This function attempts to load a JSON file that contains configuration data for various car models,
-    handling and logging any file not found errors.
+    The data comes from the in-memory car registry, which loads the JSON file once and only reloads it
+    when the file was modified. The returned dictionary is a copy and can be modified freely.
 
     Returns:
         dict or None: A dictionary containing cars configuration data, or None if the file is not found.
@@ -20,21 +27,15 @@ def get_cars_json():
     Example:
         cars_data = get_cars_json()
     """
-    try:
-        with open(cars_config_json_path, 'r') as file:
-            data = json.load(file)
-            return data
-    except FileNotFoundError:
-        logger.error(f'cars_config file on {str(cars_config_json_path)} not found')
-        return None
+    return car_registry.get_cars()
 
 
 def get_auto_id(rfid):
     """
     Retrieves the auto ID associated with a given RFID from the cars configuration.
 
-    This function searches through a preloaded cars configuration JSON to find the auto ID corresponding
-    to the specified RFID code.
+    This function looks up the auto ID corresponding to the specified RFID code in the RFID index of the
+    in-memory car registry, without reading the configuration file.
 
     Args:
         rfid (str): The RFID code to search for in the car configurations.
@@ -45,13 +46,7 @@ def get_auto_id(rfid):
     Example:
         auto_id = get_auto_id('12345RFIDCode')
     """
-    data = get_cars_json()
-    if data:
-        for model, details in data.items():
-            if any(d.get('RFID') == rfid for d in details):
-                auto_id = next((d.get('AutoID') for d in details if 'AutoID' in d), None)
-                return auto_id
-    return None
+    return car_registry.get_auto_id(rfid)
 
 
 def get_car_name(auto_id):
@@ -67,13 +62,7 @@ def get_car_name(auto_id):
     Example:
         car_name = get_car_name('AU123ID')
     """
-    data = get_cars_json()
-    if data:
-
-        for model, details in data.items():
-            if any(d.get('AutoID') == auto_id for d in details):
-                return model
-    return None
+    return car_registry.get_car_name(auto_id)
 
 
 def save_car_data(data):
@@ -89,13 +78,7 @@ def save_car_data(data):
     Example:
         success = save_car_data(modified_data)
     """
-    try:
-        with open(cars_config_json_path, 'w') as file:
-            json.dump(data, file, indent=4)
-            return True
-    except IOError as e:
-        logger.warning(f'Failed to write to cars_confing.json')
-    return False
+    return car_registry.save_cars(data)
 
 
 def update_car_data(auto_id_list):
@@ -111,27 +94,36 @@ def update_car_data(auto_id_list):
     Example:
         updated = update_car_data(['AU123ID', 'AU456ID'])
     """
-    data_changed = False
-    data = get_cars_json()
-    if data:
-        for auto_id in auto_id_list:
-            found = False
-            for key, values in data.items():
-                for value in values:
-                    if value.get("AutoID", "").replace("_", "").lower() == auto_id.replace("_", "").lower():
-                        found = True
-                        break
-                if found:
-                    break
-
-            if not found:
-                key_name = auto_id.replace('_', ' ')
-                data[key_name] = [{"RFID": None}, {"AutoID": auto_id}]
-                data_changed = True
-                logger.info(f'Car {auto_id} added to cars_confing')
-
-    if data_changed:
-        return save_car_data(data)
+    return car_registry.add_cars(auto_id_list)
+
+
+def remove_car_data(auto_id_list):
+    """
+    Removes the cars of the provided list of auto IDs from the cars configuration.
+
+    Args:
+        auto_id_list (list of str): List of auto IDs to remove from the configuration.
+
+    Returns:
+        bool or None: True if the configuration was updated and saved successfully; None if nothing was removed.
+
+    Example:
+        removed = remove_car_data(['AU123ID'])
+    """
+    return car_registry.remove_cars(auto_id_list)
+
+
+def get_normalized_auto_ids():
+    """
+    Retrieves the normalized auto IDs of all cars in the cars configuration, e.g. to compare them with the registry.
+
+    Returns:
+        set of str: The auto IDs without underscores in lower case.
+
+    Example:
+        known = get_normalized_auto_ids()
+    """
+    return car_registry.normalized_auto_ids()
 
 
 def set_car_rfid(auto_id, new_rfid):
@@ -148,18 +140,25 @@ def set_car_rfid(auto_id, new_rfid):
     Example:
         success = set_car_rfid('AU123ID', 'new12345RFIDCode')
     """
-    model_name = get_car_name(auto_id)
-    if not model_name:
-        logger.warning(f"AutoID {auto_id} not found in cars_confing. Couldn\'t set the new rfid!")
-        return False
+    return car_registry.set_rfid(auto_id, new_rfid)
 
-    data = get_cars_json()
-    if data and model_name in data:
-        for entry in data[model_name]:
-            if entry.get("AutoID") == auto_id:
-                data[model_name] = [{"RFID": new_rfid}, {"AutoID": auto_id}]
-                return save_car_data(data)
-    return False
+
+def set_car_rfids(mapping):
+    """
+    Updates the RFIDs of several auto IDs in the car configuration with a single write.
+
+    Either all RFIDs are updated or, if one of the auto IDs is unknown or the write fails, none of them.
+
+    Args:
+        mapping (dict): Dictionary of auto ID to the new RFID.
+
+    Returns:
+        bool: True if the RFIDs are updated and saved successfully; False otherwise.
+
+    Example:
+        success = set_car_rfids({'AU123ID': 'new12345RFIDCode', 'AU456ID': 'new67890RFIDCode'})
+    """
+    return car_registry.set_rfids(mapping)
 
 
 def get_rfid_forSimulation(auto_id):
@@ -178,12 +177,5 @@ def get_rfid_forSimulation(auto_id):
     Example:
         rfid_sim = get_rfid_forSimulation('AU123ID')
     """
-    data = get_cars_json()
-    if data:
-        for model, details in data.items():
-            if any(d.get('AutoID') == auto_id for d in details):
-                rfid = next((d.get('RFID') for d in details if 'RFID' in d), None)
-                rfid_element = f"[]{rfid}\n[]ANT2..." if rfid else None
-                return rfid_element
-    return None
-
+    rfid = car_registry.get_rfid(auto_id)
+    return f"[]{rfid}\n[]ANT2..." if rfid else None
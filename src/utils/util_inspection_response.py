@@ -1,20 +1,40 @@
+import hashlib
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
 from config.env_config import settings
 
 inspection_plan_response_config_path = os.path.join(settings.config_path, 'inspection_plan_response_config.json')
 
+# Returned while the config file is missing; always the same object, so compiled plans stay valid
+_MISSING_RESPONSE_CONFIG = {}
+_response_config = _MISSING_RESPONSE_CONFIG
+_response_config_mtime = None
+_response_config_checked_at = None
+_compiled_plans = OrderedDict()
+_compiled_plans_lock = threading.Lock()
 
-def create_response_plan(inspection_plan, inspection_response_simplified):
+
+def create_response_plan(inspection_plan, inspection_response_simplified, missing_cameras=None):
     """
     Generates a response plan based on an inspection plan and simplified inspection responses.
     
     This function maps inspection responses to the relevant sections of an inspection plan,
-    considering specific conditions and keys to update the response accordingly.
+    considering specific conditions and keys to update the response accordingly. The plan structure is
+    compiled once into response slots (see `compile_response_plan`), so building a response is a single
+    pass over the precomputed slots.
+
+    If cameras didn't reply, a class without an answer might have been covered by one of them, so its slots are
+    None (unknown) instead of their default, and the response plan is marked as 'partial' with the
+    'missing_cameras'.
 
     Args:
         inspection_plan (dict): Dictionary containing details of the inspection plan.
         inspection_response_simplified (dict): Simplified responses from the inspection camera.
+        missing_cameras (list, optional): The cameras that didn't reply.
 
     Returns:
         dict: A dictionary containing the updated response plan based on the provided inspection inputs.
@@ -22,16 +42,48 @@ def create_response_plan(inspection_plan, inspection_response_simplified):
     Example:
         response_plan = create_response_plan(inspection_details, simplified_responses)
     """
-    inspection_plan_part = inspection_plan['Inspection_Plan']
-    response_plan = {
-        "Response_Plan": {}
-    }
-    response_plan_part = response_plan["Response_Plan"]
-    # Durchgehen des 'Inspection_Plan'-Teils
-    for class_name, details in inspection_plan_part.items():
-        response_plan_part[class_name] = {}
-        camera_key = _get_camera_response_key(class_name)
+    class_names, slots = compile_response_plan(inspection_plan['Inspection_Plan'])
+    response_plan_part = {class_name: {} for class_name in class_names}
+    for class_name, sub_category, camera_key, sub, default in slots:
+        new_val = _get_value(inspection_response_simplified, camera_key, sub)
+        if new_val is True or new_val is False:
+            response_plan_part[class_name][sub_category] = new_val
+        else:
+            response_plan_part[class_name][sub_category] = None if missing_cameras else default
+    if missing_cameras:
+        return {"Response_Plan": response_plan_part, "partial": True, "missing_cameras": list(missing_cameras)}
+    return {"Response_Plan": response_plan_part}
+
+
+def compile_response_plan(inspection_plan_part):
+    """
+    Compiles the 'Inspection_Plan' part of an inspection plan into a flat list of response slots.
+
+    Each slot is a tuple (class_name, sub_category, camera_key, sub, default): the camera response key of the
+    class from the mapping config, the attribute of the camera response ('in_place', 'free_of_damage',
+    'has_correct_color' or the sub-category itself) and the value that is used if the camera gives no answer.
+    Compiled plans are cached by a hash of the plan content in an LRU of `response_plan_cache_size` entries and
+    are recompiled when the mapping config changes.
 
+    Args:
+        inspection_plan_part (dict): The 'Inspection_Plan' part of an inspection plan.
+
+    Returns:
+        tuple: The class names in plan order and the list of response slots.
+
+    Example:
+        class_names, slots = compile_response_plan(inspection_plan['Inspection_Plan'])
+    """
+    config = _get_response_config()
+    key = hashlib.sha1(json.dumps(inspection_plan_part).encode('utf-8')).hexdigest()
+    with _compiled_plans_lock:
+        compiled = _compiled_plans.get(key)
+        if compiled is not None and compiled[0] is config:
+            _compiled_plans.move_to_end(key)
+            return compiled[1]
+    slots = []
+    for class_name, details in inspection_plan_part.items():
+        camera_key = config.get(class_name, None)
         for sub_category, value in details.items():
             if "in_place" in sub_category:
                 sub = "in_place"
@@ -41,18 +93,15 @@ def create_response_plan(inspection_plan, inspection_response_simplified):
                 sub = "has_correct_color"
             else:
                 sub = sub_category
-
-            new_val = _get_value(inspection_response_simplified, camera_key, sub)
-            if new_val is True:
-                response_plan_part[class_name][sub_category] = new_val
-            elif new_val is False:
-                response_plan_part[class_name][sub_category] = new_val
-            else:
-                if None in value:
-                    response_plan_part[class_name][sub_category] = None
-                else:
-                    response_plan_part[class_name][sub_category] = False
-    return response_plan
+            default = None if None in value else False
+            slots.append((class_name, sub_category, camera_key, sub, default))
+    compiled_plan = (tuple(inspection_plan_part), slots)
+    with _compiled_plans_lock:
+        _compiled_plans[key] = (config, compiled_plan)
+        _compiled_plans.move_to_end(key)
+        while len(_compiled_plans) > settings.response_plan_cache_size:
+            _compiled_plans.popitem(last=False)
+    return compiled_plan
 
 
 def get_simplified_inspection_response(data_in, schwellwert=0.6):
@@ -76,36 +125,123 @@ def get_simplified_inspection_response(data_in, schwellwert=0.6):
     return _get_simplified_inspection_response(detections, schwellwert)
 
 
-def _get_camera_response_key(inspection_plan_key):
+def merge_camera_responses(camera_responses):
     """
-    Retrieves the corresponding camera response key for a given inspection plan key from a configuration file.
+    Merges the responses of several cameras into one response with 'detections' and 'classes'.
 
-    This function looks up a mapping in a JSON configuration file that translates inspection plan keys to
-    camera response keys, which are used to align inspection data with the respective camera outputs.
+    The class IDs of each camera are remapped to one ID per class name, so that cameras with different class
+    lists can be merged. The merged response has one detection per class: of every camera its last detection of
+    the class, like in `get_simplified_inspection_response`, and of these the one with the highest confidence.
+    Detections of class IDs that are missing in the 'classes' of their camera are skipped. Cameras without response
+    (None) are listed in 'missing_cameras' and mark the merged response as 'partial'.
 
     Args:
-        inspection_plan_key (str): The key used in the inspection plan to identify a specific inspection criteria or item.
+        camera_responses (dict): Camera name to its response, or None if the camera didn't reply.
 
     Returns:
-        str or None: The corresponding camera response key if found, otherwise None.
+        dict: The merged response with 'detections', 'classes', 'partial' and 'missing_cameras'.
 
     Example:
-        camera_key = _get_camera_response_key('front_bumper_inspection')
+        camera_response = merge_camera_responses({"front": front_response, "rear": None})
+    """
+    class_ids = {}
+    best_detections = {}
+    missing_cameras = []
+    for camera, camera_response in camera_responses.items():
+        if camera_response is None:
+            missing_cameras.append(camera)
+            continue
+        classes = camera_response.get("classes", {})
+        for class_name in classes.values():
+            class_ids.setdefault(class_name, len(class_ids))
+        last_detections = {}
+        for detection in camera_response.get("detections", []):
+            class_name = classes.get(str(detection[2]))
+            if class_name is not None:
+                last_detections[class_name] = detection
+        for class_name, detection in last_detections.items():
+            best_detection = best_detections.get(class_name)
+            # detection[0] is the confidence
+            if best_detection is None or detection[0] > best_detection[0]:
+                best_detections[class_name] = detection
+    return {
+        "detections": [[detection[0], detection[1], class_ids[class_name]]
+                       for class_name, detection in best_detections.items()],
+        "classes": {str(class_id): class_name for class_name, class_id in class_ids.items()},
+        "partial": bool(missing_cameras),
+        "missing_cameras": missing_cameras
+    }
+
 
-    Raises:
-        FileNotFoundError: If the configuration file does not exist at the specified path.
-        json.JSONDecodeError: If there are errors decoding the JSON data from the configuration file.
+def _get_last_detection_rows(json_data):
     """
+    Finds the row of the last detection of every class in one pass over the detections.
+
+    The reduction per class ID runs in C through `dict`, `zip` and `map`, and the class name lookup and the
+    result dictionaries are built once per class instead of once per detection. Class IDs that share a class name
+    are merged: the class names keep the order of their first detection and the last detection wins, like when
+    overwriting entries per detection.
+
+    Args:
+        json_data (dict): The original JSON data containing detection information.
+
+    Returns:
+        dict: A dictionary of class name to the index of its last detection in 'detections'.
+
+    Example:
+        last_rows = _get_last_detection_rows(raw_json_data)
+    """
+    # dict() keeps the order of the first and the value of the last occurrence of every class ID
+    detections = json_data["detections"]
+    class_ids = map(itemgetter(2), detections)
+    if len(set(map(type, map(itemgetter(2), detections)))) > 1:
+        # e.g. 1 and 1.0 are equal keys, but different classes ('1' and '1.0')
+        class_ids = map(str, class_ids)
+    rows_by_class_id = dict(zip(class_ids, range(len(detections))))
+    rows_by_class = {}
+    for class_id, row in rows_by_class_id.items():
+        class_name = json_data["classes"][str(class_id)]
+        if rows_by_class.get(class_name, -1) < row:
+            rows_by_class[class_name] = row
+    return rows_by_class
+
+
+def _get_response_config():
+    """
+    Returns the mapping of inspection plan keys to camera response keys from the configuration file.
+
+    The file is loaded once and reloaded when its modification time changes, which is checked at most every
+    `response_config_check_interval` seconds. A new dictionary is returned after every reload, so compiled
+    response plans can tell whether they were compiled with the current configuration. While the file is missing,
+    the same empty dictionary is returned.
+
+    Returns:
+        dict: The mapping, or an empty dictionary if the file is missing or invalid.
+    """
+    global _response_config, _response_config_mtime, _response_config_checked_at
+    now = time.monotonic()
+    if _response_config_checked_at is not None \
+            and now - _response_config_checked_at < settings.response_config_check_interval:
+        return _response_config
+    first_check = _response_config_checked_at is None
+    _response_config_checked_at = now
     try:
-        with open(inspection_plan_response_config_path, 'r') as file:
-            data = json.load(file)
+        mtime = os.stat(inspection_plan_response_config_path).st_mtime_ns
     except FileNotFoundError:
-        print("Datei nicht gefunden.")
-        data = {}
+        if first_check or _response_config_mtime is not None:
+            print("Datei nicht gefunden.")
+        _response_config, _response_config_mtime = _MISSING_RESPONSE_CONFIG, None
+        return _response_config
+    if mtime == _response_config_mtime:
+        return _response_config
+    try:
+        with open(inspection_plan_response_config_path, 'r') as file:
+            _response_config = json.load(file)
     except json.JSONDecodeError:
         print("Fehler beim Parsen der JSON-Daten.")
-        data = {}
-    return data.get(inspection_plan_key, None)
+        _response_config = {}
+    _response_config_mtime = mtime
+    return _response_config
 
 
 def _get_value(simplified_data_in, key, sub):
@@ -150,18 +286,15 @@ def _transform_detections(json_data):
         transformed_data = _transform_detections(raw_json_data)
     """
     # Umformatieren der detections, organisiert nach class_name
+    # Nur die letzte Detection jeder Klasse wird übernommen
+    detections = json_data["detections"]
     detections_by_class = {}
-    for detection in json_data["detections"]:
-        detection_confidence = detection[0]
-        is_free_of_damage = detection[1]
-        class_id = detection[2]
-        class_name = json_data["classes"][str(class_id)]
-
-        # Aktualisieren mit dem letzten verfügbaren Wert für jede Klasse
+    for class_name, row in _get_last_detection_rows(json_data).items():
+        detection = detections[row]
         detections_by_class[class_name] = {
-            "class_id": class_id,
-            "detection_confidence": detection_confidence,
-            "free_of_damage": is_free_of_damage
+            "class_id": detection[2],
+            "detection_confidence": detection[0],
+            "free_of_damage": detection[1]
         }
 
     return detections_by_class
@@ -0,0 +1,75 @@
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+_content_type_aliases = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def get_accepted_content_types():
+    """
+    Returns the payload encodings this installation can decode, preferred first.
+
+    MessagePack and CBOR are only offered if the optional `msgpack` and `cbor2` packages are installed,
+    JSON is always accepted as the fallback.
+
+    Returns:
+        list of str: The accepted content types.
+
+    Example:
+        accept = ", ".join(get_accepted_content_types())  # e.g. 'application/msgpack, application/json'
+    """
+    content_types = []
+    if msgpack is not None:
+        content_types.append(MSGPACK)
+    if cbor2 is not None:
+        content_types.append(CBOR)
+    content_types.append(JSON)
+    return content_types
+
+
+def decode_payload(payload, content_type=None):
+    """
+    Decodes a camera payload straight from its bytes according to its content type.
+
+    Payloads without content type, or with a content type whose package isn't installed, are decoded as JSON.
+
+    Args:
+        payload (bytes): The raw MQTT payload.
+        content_type (str, optional): The content type of the payload, e.g. 'application/msgpack'.
+
+    Returns:
+        Any: The decoded payload, e.g. a dictionary with 'detections' and 'classes'.
+
+    Raises:
+        ValueError: If the payload can't be decoded.
+
+    Example:
+        camera_response = decode_payload(msg.payload, "application/cbor")
+    """
+    content_type = (content_type or JSON).split(";")[0].strip().lower()
+    content_type = _content_type_aliases.get(content_type, content_type)
+    try:
+        if content_type == MSGPACK and msgpack is not None:
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if content_type == CBOR and cbor2 is not None:
+            return cbor2.loads(payload)
+        return json.loads(payload)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to decode {content_type} payload: {e}") from e
@@ -0,0 +1,76 @@
+import time
+import unittest
+from src.utils.AASCache import AttachmentCache, SubmodelIdentifierCache
+
+HOST = "192.168.0.10:8081"
+
+
+class SubmodelIdentifierCacheTest(unittest.TestCase):
+
+    def test_identifiers_are_cached_per_host_and_id_short(self):
+        cache = SubmodelIdentifierCache(max_size=8, ttl=60)
+        self.assertIsNone(cache.get(HOST, "Inspection_Plan"))
+        cache.put(HOST, "Inspection_Plan", "dXJuOnBsYW4=")
+        self.assertEqual(cache.get(HOST, "Inspection_Plan"), "dXJuOnBsYW4=")
+        self.assertIsNone(cache.get("192.168.0.11:8081", "Inspection_Plan"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_expired_identifier_is_resolved_again(self):
+        cache = SubmodelIdentifierCache(max_size=8, ttl=0.02)
+        cache.put(HOST, "Inspection_Plan", "dXJuOnBsYW4=")
+        time.sleep(0.03)
+        self.assertIsNone(cache.get(HOST, "Inspection_Plan"))
+
+    def test_least_recently_used_identifier_is_evicted(self):
+        cache = SubmodelIdentifierCache(max_size=2, ttl=60)
+        cache.put(HOST, "Inspection_Plan", "a")
+        cache.put(HOST, "Response_Plan", "b")
+        cache.get(HOST, "Inspection_Plan")
+        cache.put(HOST, "Other", "c")
+        self.assertIsNone(cache.get(HOST, "Response_Plan"))
+        self.assertEqual(cache.get(HOST, "Inspection_Plan"), "a")
+
+    def test_invalidate(self):
+        cache = SubmodelIdentifierCache(max_size=8, ttl=60)
+        cache.put(HOST, "Inspection_Plan", "a")
+        cache.put(HOST, "Response_Plan", "b")
+        cache.put("other:1", "Inspection_Plan", "a")
+        self.assertTrue(cache.invalidate_identifier(HOST, "a"))
+        self.assertFalse(cache.invalidate_identifier(HOST, "a"))
+        self.assertIsNone(cache.get(HOST, "Inspection_Plan"))
+        self.assertEqual(cache.get("other:1", "Inspection_Plan"), "a")
+        cache.invalidate(HOST)
+        self.assertIsNone(cache.get(HOST, "Response_Plan"))
+
+
+class AttachmentCacheTest(unittest.TestCase):
+    URL = f"http://{HOST}/submodels/dXJuOnBsYW4=/submodel-elements/Inspection_Plan/attachment"
+
+    def test_conditional_headers_of_a_cached_attachment(self):
+        cache = AttachmentCache(max_size=8)
+        self.assertEqual(cache.conditional_headers(self.URL), {})
+        cache.store(self.URL, {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, {"plan": 1})
+        self.assertEqual(cache.conditional_headers(self.URL),
+                         {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        self.assertEqual(cache.get(self.URL), {"plan": 1})
+        self.assertEqual(cache.revalidated, 1)
+
+    def test_attachment_without_validator_is_not_cached(self):
+        cache = AttachmentCache(max_size=8)
+        cache.store(self.URL, {"ETag": '"v1"'}, {"plan": 1})
+        cache.store(self.URL, {}, {"plan": 2})
+        self.assertIsNone(cache.get(self.URL))
+        self.assertEqual(cache.conditional_headers(self.URL), {})
+
+    def test_eviction_and_invalidation(self):
+        cache = AttachmentCache(max_size=2)
+        for index in range(3):
+            cache.store(f"{self.URL}/{index}", {"ETag": f'"{index}"'}, index)
+        self.assertIsNone(cache.get(f"{self.URL}/0"))
+        cache.invalidate(f"{self.URL}/2")
+        self.assertIsNone(cache.get(f"{self.URL}/2"))
+        self.assertEqual(cache.get(f"{self.URL}/1"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+from unittest import mock
+from src.utils.AASRegistry import AASRegistry, build_index, get_registry, next_cursor
+
+
+def descriptor(id_short, href=None):
+    item = {"idShort": id_short}
+    if href is not None:
+        item["endpoints"] = [{"protocolInformation": {"href": href}}]
+    return item
+
+
+class BuildIndexTest(unittest.TestCase):
+
+    def test_first_endpoint_of_the_first_descriptor_wins(self):
+        index = build_index([
+            descriptor("BMW_X7", "http://192.168.0.10:8081/shells/a"),
+            {"endpoints": []},
+            descriptor("BMW_X7", "http://192.168.0.11:8081/shells/b"),
+            descriptor("BMW_M4"),
+        ])
+        self.assertEqual(index, {"BMW_X7": "http://192.168.0.10:8081/shells/a", "BMW_M4": None})
+
+
+class NextCursorTest(unittest.TestCase):
+
+    def test_cursor_of_the_next_page(self):
+        self.assertEqual(next_cursor({"paging_metadata": {"cursor": "c2hlbGwtMTAw"}}), "c2hlbGwtMTAw")
+
+    def test_last_page(self):
+        self.assertIsNone(next_cursor({}))
+        self.assertIsNone(next_cursor({"paging_metadata": None}))
+        self.assertIsNone(next_cursor({"paging_metadata": {"cursor": ""}}))
+
+    def test_repeated_cursor_stops_the_enumeration(self):
+        self.assertIsNone(next_cursor({"paging_metadata": {"cursor": "c2hlbGwtMTAw"}}, "c2hlbGwtMTAw"))
+
+
+class AASRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = AASRegistry("http://registry", ttl=60, min_refresh_interval=60)
+        self.index = {"BMW_X7": "http://192.168.0.10:8081/shells/a"}
+
+        def refresh():
+            self.registry.mark_attempt()
+            self.registry.install(dict(self.index))
+            return True
+
+        patcher = mock.patch.object(self.registry, "refresh", side_effect=refresh)
+        self.refresh = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups_are_served_from_the_snapshot(self):
+        self.assertEqual(self.registry.get_host("BMW_X7"), "192.168.0.10:8081")
+        self.assertEqual(self.registry.get_all_idShorts(), ["BMW_X7"])
+        self.assertEqual(self.refresh.call_count, 1)
+
+    def test_miss_forces_a_refresh_at_most_once_per_interval(self):
+        self.registry.get_href("BMW_X7")
+        self.index["BMW_M4"] = "http://192.168.0.12:8081/shells/c"
+        self.assertIsNone(self.registry.get_href("BMW_M4"))
+        self.registry._last_attempt = time.monotonic() - 61
+        self.assertEqual(self.registry.get_host("BMW_M4"), "192.168.0.12:8081")
+        self.assertEqual(self.refresh.call_count, 2)
+
+    def test_version_changes_only_with_the_index(self):
+        self.registry.install({"BMW_X7": "a"})
+        version = self.registry.version
+        self.registry.install({"BMW_X7": "a"})
+        self.assertEqual(self.registry.version, version)
+        self.registry.install({"BMW_X7": "b"})
+        self.assertEqual(self.registry.version, version + 1)
+
+    def test_snapshot_becomes_stale_after_its_ttl(self):
+        self.assertTrue(self.registry.is_stale())
+        self.registry.install({})
+        self.assertFalse(self.registry.is_stale())
+        self.registry.loaded_at -= 61
+        self.assertTrue(self.registry.is_stale())
+
+
+class GetRegistryTest(unittest.TestCase):
+
+    def test_one_snapshot_per_registry_url(self):
+        self.assertIs(get_registry("http://registry-a"), get_registry("http://registry-a"))
+        self.assertIsNot(get_registry("http://registry-a"), get_registry("http://registry-b"))
+
+
+if __name__ == '__main__':
+    unittest.main()
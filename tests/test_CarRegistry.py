@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.utils.CarRegistry import CarRegistry, normalize_auto_id
+
+CARS = {
+    "BMW X7": [{"RFID": "ANT1E00401002085C43D8"}, {"AutoID": "BMW_X7"}],
+    "BMW M4": [{"RFID": None}, {"AutoID": "BMW_M4"}],
+}
+
+
+class NormalizeAutoIdTest(unittest.TestCase):
+
+    def test_underscores_and_case_are_ignored(self):
+        self.assertEqual(normalize_auto_id("BMW_X7"), normalize_auto_id("bmwx7"))
+        self.assertEqual(normalize_auto_id(None), "")
+
+
+class CarRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cars_config.json")
+        self.write(CARS)
+        self.registry = CarRegistry(self.path, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data, mtime_ns=None):
+        with open(self.path, "w") as file:
+            json.dump(data, file)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_lookups(self):
+        self.assertEqual(self.registry.get_auto_id("ANT1E00401002085C43D8"), "BMW_X7")
+        self.assertEqual(self.registry.get_car_name("BMW_X7"), "BMW X7")
+        self.assertEqual(self.registry.get_rfid("BMW_X7"), "ANT1E00401002085C43D8")
+        self.assertIsNone(self.registry.get_rfid("BMW_M4"))
+        self.assertIsNone(self.registry.get_auto_id("unknown"))
+        self.assertEqual(self.registry.normalized_auto_ids(), {"bmwx7", "bmwm4"})
+
+    def test_get_cars_returns_a_copy(self):
+        self.registry.get_cars()["BMW X7"][0]["RFID"] = "changed"
+        self.assertEqual(self.registry.get_rfid("BMW_X7"), "ANT1E00401002085C43D8")
+
+    def test_reloads_when_the_file_changes(self):
+        self.registry.get_auto_id("ANT1E00401002085C43D8")
+        self.write({"Audi A4": [{"RFID": "ANT1"}, {"AutoID": "Audi_A4"}]}, mtime_ns=1)
+        self.assertEqual(self.registry.get_auto_id("ANT1"), "Audi_A4")
+        self.assertIsNone(self.registry.get_auto_id("ANT1E00401002085C43D8"))
+
+    def test_keeps_the_last_configuration_on_invalid_json(self):
+        self.registry.get_cars()
+        with open(self.path, "w") as file:
+            file.write("{")
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(self.registry.get_car_name("BMW_X7"), "BMW X7")
+
+    def test_check_interval_skips_the_stat(self):
+        registry = CarRegistry(self.path, check_interval=3600)
+        registry.get_cars()
+        self.write({}, mtime_ns=1)
+        self.assertEqual(registry.get_car_name("BMW_X7"), "BMW X7")
+
+    def test_missing_file(self):
+        registry = CarRegistry(os.path.join(self.directory, "missing.json"), check_interval=0)
+        self.assertIsNone(registry.get_cars())
+        self.assertIsNone(registry.add_cars(["BMW_X7"]))
+        self.assertFalse(registry.set_rfids({"BMW_X7": "ANT1"}))
+
+    def test_add_cars_compares_normalized_auto_ids(self):
+        self.assertIsNone(self.registry.add_cars(["bmwx7"]))
+        self.assertTrue(self.registry.add_cars(["Audi_A4", "AUDI_A4"]))
+        with open(self.path) as file:
+            saved = json.load(file)
+        self.assertEqual(saved["Audi A4"], [{"RFID": None}, {"AutoID": "Audi_A4"}])
+        self.assertEqual(len(saved), 3)
+        self.assertEqual(self.registry.get_car_name("Audi_A4"), "Audi A4")
+
+    def test_remove_cars(self):
+        self.assertIsNone(self.registry.remove_cars(["Audi_A4"]))
+        self.assertTrue(self.registry.remove_cars(["bmw_x7"]))
+        self.assertIsNone(self.registry.get_auto_id("ANT1E00401002085C43D8"))
+        self.assertEqual(list(self.registry.get_cars()), ["BMW M4"])
+
+    def test_set_rfid(self):
+        self.assertTrue(self.registry.set_rfid("BMW_M4", "ANT2"))
+        self.assertEqual(self.registry.get_auto_id("ANT2"), "BMW_M4")
+        self.assertFalse(self.registry.set_rfid("Audi_A4", "ANT3"))
+
+    def test_set_rfids_changes_nothing_if_an_auto_id_is_unknown(self):
+        self.assertFalse(self.registry.set_rfids({"BMW_M4": "ANT2", "Audi_A4": "ANT3"}))
+        self.assertIsNone(self.registry.get_rfid("BMW_M4"))
+        self.assertTrue(self.registry.set_rfids({"BMW_M4": "ANT2", "BMW_X7": None}))
+        self.assertEqual(self.registry.get_rfid("BMW_M4"), "ANT2")
+        self.assertIsNone(self.registry.get_rfid("BMW_X7"))
+
+    def test_save_cars_replaces_the_file_atomically(self):
+        self.assertTrue(self.registry.save_cars({}))
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+        self.assertEqual(self.registry.get_cars(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+from src.utils.CircuitBreaker import CLOSED, OPEN, HALF_OPEN, CircuitBreaker, CircuitBreakerRegistry
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("192.168.0.10:8081", failure_threshold=2, reset_timeout=0.05)
+
+    def open_breaker(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertFalse(self.breaker.can_request())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.last_ok is False)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.can_request())
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertFalse(self.breaker.can_request())
+
+    def test_successful_probe_closes_the_breaker(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.breaker.allow_request()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probe_opens_the_breaker_again(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.breaker.allow_request()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_released_probe_lets_the_next_probe_through(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.breaker.allow_request()
+        self.breaker.release_probe()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_can_request_does_not_reserve_the_probe(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.can_request())
+        self.assertTrue(self.breaker.can_request())
+        self.assertTrue(self.breaker.allow_request())
+
+
+class CircuitBreakerRegistryTest(unittest.TestCase):
+
+    def test_keeps_one_breaker_per_host(self):
+        breakers = CircuitBreakerRegistry()
+        self.assertIs(breakers.get("a:1"), breakers.get("a:1"))
+        self.assertIsNot(breakers.get("a:1"), breakers.get("b:2"))
+        breakers.get("a:1").record_failure()
+        self.assertEqual(sorted(state["host"] for state in breakers.states()), ["a:1", "b:2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+from src.utils.DetectionAggregator import DetectionAggregator
+from src.utils.util_inspection_response import get_simplified_inspection_response
+
+CLASSES = {"0": "Engine_Hood", "1": "Front_Bumper"}
+
+
+def frame(*detections, missing_cameras=None):
+    camera_response = {"detections": [list(detection) for detection in detections], "classes": CLASSES}
+    if missing_cameras is not None:
+        camera_response.update({"partial": bool(missing_cameras), "missing_cameras": missing_cameras})
+    return camera_response
+
+
+class DetectionAggregatorTest(unittest.TestCase):
+
+    def test_max_with_one_frame_matches_the_simplified_response(self):
+        camera_response = frame((0.9, True, 0), (0.4, False, 1), (0.7, False, 0))
+        aggregator = DetectionAggregator(rule="max")
+        self.assertTrue(aggregator.add_frame(camera_response))
+        self.assertEqual(aggregator.result(), get_simplified_inspection_response(camera_response))
+
+    def test_max_takes_the_most_confident_frame(self):
+        aggregator = DetectionAggregator(rule="max", frame_count=3)
+        aggregator.add_frame(frame((0.5, False, 0)))
+        aggregator.add_frame(frame((0.8, True, 0)))
+        aggregator.add_frame(frame((0.3, False, 0)))
+        self.assertEqual(aggregator.result(),
+                         {"Engine_Hood": {"class_id": 0, "in_place": True, "free_of_damage": True}})
+
+    def test_majority_needs_more_than_half_of_the_frames(self):
+        aggregator = DetectionAggregator(rule="majority", frame_count=4)
+        aggregator.add_frame(frame((0.9, True, 0), (0.9, False, 1)))
+        aggregator.add_frame(frame((0.9, True, 0), (0.9, True, 1)))
+        aggregator.add_frame(frame((0.9, False, 0)))
+        aggregator.add_frame(frame((0.2, True, 0)))
+        self.assertEqual(aggregator.result(), {
+            "Engine_Hood": {"class_id": 0, "in_place": True, "free_of_damage": True},
+            "Front_Bumper": {"class_id": 1, "in_place": False, "free_of_damage": False},
+        })
+
+    def test_ewma_counts_frames_without_detection_as_zero(self):
+        aggregator = DetectionAggregator(rule="ewma", frame_count=3, alpha=0.5)
+        aggregator.add_frame(frame((1.0, True, 0)))
+        self.assertEqual(aggregator.result()["Engine_Hood"]["in_place"], True)
+        aggregator.add_frame(frame())
+        aggregator.add_frame(frame((0.4, True, 1)))
+        result = aggregator.result()
+        # Engine_Hood: 1.0 -> 0.5 -> 0.25, Front_Bumper appears in the third frame with weight alpha: 0.2
+        self.assertEqual(result["Engine_Hood"], {"class_id": 0, "in_place": False, "free_of_damage": False})
+        self.assertEqual(result["Front_Bumper"], {"class_id": 1, "in_place": False, "free_of_damage": True})
+
+    def test_pass_is_complete_at_the_frame_count_or_the_deadline(self):
+        aggregator = DetectionAggregator(frame_count=2)
+        self.assertFalse(aggregator.add_frame(frame((0.9, True, 0))))
+        self.assertIsNone(aggregator.remaining_time())
+        self.assertTrue(aggregator.add_frame(frame((0.9, True, 0))))
+        aggregator = DetectionAggregator(frame_count=5, timeout=0.02)
+        self.assertFalse(aggregator.is_complete())
+        time.sleep(0.03)
+        self.assertTrue(aggregator.is_complete())
+        self.assertEqual(aggregator.remaining_time(), 0.0)
+
+    def test_camera_is_missing_only_if_missing_in_every_frame(self):
+        aggregator = DetectionAggregator(frame_count=3)
+        aggregator.add_frame(frame((0.9, True, 0), missing_cameras=["front", "rear"]))
+        aggregator.add_frame(frame((0.9, True, 0), missing_cameras=["rear"]))
+        self.assertEqual(aggregator.missing_cameras, ["rear"])
+        aggregator.add_frame(frame((0.9, True, 0), missing_cameras=[]))
+        self.assertEqual(aggregator.missing_cameras, [])
+
+    def test_unknown_rule_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DetectionAggregator(rule="median")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+from src.utils.InspectionDispatcher import InspectionDispatcher
+
+
+class InspectionDispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.processed = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, event):
+        # Later events finish their preparation first
+        time.sleep(0.002 * (10 - event % 10))
+        return event * 10
+
+    def process(self, event, prepared):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.001)
+        self.processed.append((event, prepared))
+        with self._lock:
+            self.active -= 1
+
+    def test_events_are_processed_one_at_a_time_in_submit_order(self):
+        dispatcher = InspectionDispatcher(self.prepare, self.process, max_queue_size=32, worker_count=4)
+        dispatcher.start()
+        for event in range(20):
+            self.assertTrue(dispatcher.submit(event))
+        dispatcher.stop()
+        self.assertEqual(self.processed, [(event, event * 10) for event in range(20)])
+        self.assertEqual(self.max_active, 1)
+        self.assertEqual(dispatcher.stats()["processed"], 20)
+
+    def test_failed_event_does_not_block_the_next_ones(self):
+        def prepare(event):
+            if event == 1:
+                raise RuntimeError("plan fetch failed")
+            return event
+
+        dispatcher = InspectionDispatcher(prepare, self.process, max_queue_size=8, worker_count=2)
+        dispatcher.start()
+        for event in range(4):
+            dispatcher.submit(event)
+        dispatcher.stop()
+        self.assertEqual([event for event, _ in self.processed], [0, 2, 3])
+        self.assertEqual(dispatcher.stats()["failed"], 1)
+
+    def test_full_queue_rejects_and_reports_the_new_event(self):
+        dropped = []
+        release = threading.Event()
+        dispatcher = InspectionDispatcher(lambda event: release.wait(), lambda event, prepared: None,
+                                          max_queue_size=2, worker_count=1, policy="reject", on_drop=dropped.append)
+        dispatcher.start()
+        self.assertTrue(dispatcher.submit("ANT0"))
+        time.sleep(0.02)
+        results = [dispatcher.submit(event) for event in ("ANT1", "ANT2", "ANT3", "ANT4")]
+        release.set()
+        dispatcher.stop()
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(dropped, ["ANT3", "ANT4"])
+        self.assertEqual(dispatcher.stats()["rejected"], 2)
+
+    def test_full_queue_drops_and_reports_the_oldest_event(self):
+        dropped = []
+        release = threading.Event()
+        dispatcher = InspectionDispatcher(lambda event: release.wait(), self.process, max_queue_size=2,
+                                          worker_count=1, policy="drop_oldest", on_drop=dropped.append)
+        dispatcher.start()
+        dispatcher.submit(0)
+        time.sleep(0.02)
+        results = [dispatcher.submit(event) for event in (1, 2, 3, 4)]
+        release.set()
+        dispatcher.stop()
+        self.assertEqual(results, [True] * 4)
+        self.assertEqual(dropped, [1, 2])
+        self.assertEqual([event for event, _ in self.processed], [0, 3, 4])
+        self.assertEqual(dispatcher.stats()["dropped"], 2)
+
+    def test_failed_events_are_reported(self):
+        dropped = []
+
+        def process(event, prepared):
+            if event == "ANT1":
+                raise RuntimeError("camera failed")
+
+        dispatcher = InspectionDispatcher(lambda event: None, process, worker_count=2, on_drop=dropped.append)
+        dispatcher.start()
+        for event in ("ANT0", "ANT1", "ANT2"):
+            dispatcher.submit(event)
+        dispatcher.stop()
+        self.assertEqual(dropped, ["ANT1"])
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            InspectionDispatcher(self.prepare, self.process, policy="drop_newest")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+from src.utils.LatencyHistogram import LatencyHistogram, get_adaptive_timeout, get_hedge_delay
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for _ in range(90):
+            histogram.record(0.010)
+        for _ in range(10):
+            histogram.record(0.500)
+        p50, p99 = histogram.percentile(50), histogram.percentile(99)
+        self.assertTrue(0.010 <= p50 < 0.010 * 1.2)
+        self.assertTrue(0.500 <= p99 < 0.500 * 1.2)
+        self.assertEqual(histogram.stats()["count"], 100)
+
+    def test_latencies_beyond_the_range_are_clamped(self):
+        histogram = LatencyHistogram(max_latency=1.0)
+        histogram.record(5.0)
+        self.assertEqual(histogram.percentile(99), 1.0)
+
+    def test_old_samples_fade_out(self):
+        histogram = LatencyHistogram(window=64)
+        for _ in range(63):
+            histogram.record(1.0)
+        for _ in range(200):
+            histogram.record(0.010)
+        self.assertLess(histogram.count, 64)
+        self.assertLess(histogram.percentile(95), 0.1)
+
+
+class AdaptiveTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.multiple("src.utils.LatencyHistogram.settings", camera_latency_min_samples=5,
+                                      camera_timeout_factor=2.0, camera_timeout_min=0.2, camera_timeout_max=2.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def histogram(self, latency, samples=5):
+        histogram = LatencyHistogram()
+        for _ in range(samples):
+            histogram.record(latency)
+        return histogram
+
+    def test_maximum_until_every_camera_has_enough_samples(self):
+        self.assertEqual(get_adaptive_timeout([self.histogram(0.3), self.histogram(0.3, samples=4)]), 2.0)
+        self.assertIsNone(get_hedge_delay(self.histogram(0.3, samples=4)))
+
+    def test_p99_of_the_slowest_camera_times_the_factor(self):
+        slow = self.histogram(0.3)
+        timeout = get_adaptive_timeout([self.histogram(0.05), slow])
+        self.assertAlmostEqual(timeout, slow.percentile(99) * 2.0)
+        self.assertEqual(get_hedge_delay(slow), slow.percentile(95))
+
+    def test_timeout_is_limited(self):
+        self.assertEqual(get_adaptive_timeout([self.histogram(0.01)]), 0.2)
+        self.assertEqual(get_adaptive_timeout([self.histogram(5.0)]), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import time
+import unittest
+from src.utils.RFIDDebouncer import RFIDDebouncer
+
+
+class RFIDDebouncerTest(unittest.TestCase):
+
+    def test_repeated_read_within_the_window_is_suppressed(self):
+        debouncer = RFIDDebouncer(window=60, max_tags=8)
+        self.assertTrue(debouncer.accept("ANT1"))
+        self.assertFalse(debouncer.accept("ANT1"))
+        self.assertFalse(debouncer.accept("ANT1"))
+        self.assertEqual(debouncer.stats(), {"tags": 1, "accepted": 1, "suppressed": 2})
+
+    def test_other_tags_are_not_suppressed(self):
+        debouncer = RFIDDebouncer(window=60, max_tags=8)
+        self.assertTrue(debouncer.accept("ANT1"))
+        self.assertTrue(debouncer.accept("ANT2"))
+        self.assertFalse(debouncer.accept("ANT1"))
+
+    def test_tag_is_accepted_again_after_a_quiet_window(self):
+        debouncer = RFIDDebouncer(window=0.05, max_tags=8)
+        self.assertTrue(debouncer.accept("ANT1"))
+        time.sleep(0.07)
+        self.assertTrue(debouncer.accept("ANT1"))
+
+    def test_every_read_restarts_the_window(self):
+        debouncer = RFIDDebouncer(window=0.08, max_tags=8)
+        self.assertTrue(debouncer.accept("ANT1"))
+        for _ in range(3):
+            time.sleep(0.04)
+            self.assertFalse(debouncer.accept("ANT1"))
+
+    def test_forgotten_tag_is_accepted(self):
+        debouncer = RFIDDebouncer(window=60, max_tags=8)
+        debouncer.accept("ANT1")
+        debouncer.forget("ANT1")
+        debouncer.forget("ANT2")
+        self.assertTrue(debouncer.accept("ANT1"))
+
+    def test_least_recently_read_tag_is_evicted(self):
+        debouncer = RFIDDebouncer(window=60, max_tags=2)
+        debouncer.accept("ANT1")
+        debouncer.accept("ANT2")
+        debouncer.accept("ANT1")
+        debouncer.accept("ANT3")
+        self.assertEqual(debouncer.stats()["tags"], 2)
+        self.assertFalse(debouncer.accept("ANT1"))
+        self.assertTrue(debouncer.accept("ANT2"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+from src.utils.CarRegistry import normalize_auto_id
+from src.utils.RegistrySync import RegistrySync
+
+
+class FakeRegistry:
+
+    def __init__(self, id_shorts):
+        self.id_shorts = id_shorts
+        self.refresh_ok = True
+        self.version = 1
+
+    def refresh(self):
+        return self.refresh_ok
+
+    def get_all_idShorts(self):
+        return list(self.id_shorts)
+
+
+class RegistrySyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = FakeRegistry(["BMW_X7", "BMW_M4"])
+        self.known = set()
+        patches = [
+            mock.patch("src.utils.RegistrySync.get_registry", return_value=self.registry),
+            mock.patch("src.utils.RegistrySync.get_normalized_auto_ids", side_effect=lambda: set(self.known)),
+            mock.patch("src.utils.RegistrySync.update_car_data", side_effect=self.add),
+            mock.patch("src.utils.RegistrySync.remove_car_data", side_effect=self.remove),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.sync = RegistrySync(interval=3600, missing_syncs=2)
+
+    def add(self, auto_ids):
+        self.known.update(normalize_auto_id(auto_id) for auto_id in auto_ids)
+
+    def remove(self, auto_ids):
+        self.known.difference_update(normalize_auto_id(auto_id) for auto_id in auto_ids)
+
+    def test_adds_new_id_shorts(self):
+        self.known.add("bmwx7")
+        self.assertTrue(self.sync.sync())
+        self.assertEqual(self.known, {"bmwx7", "bmwm4"})
+        self.assertEqual(self.sync.status()["added"], 1)
+        self.assertEqual(self.sync.status()["registry_version"], 1)
+        self.assertIsNotNone(self.sync.status()["synced_at"])
+
+    def test_removes_after_consecutive_missing_syncs(self):
+        self.sync.sync()
+        self.registry.id_shorts = ["BMW_X7"]
+        self.sync.sync()
+        self.assertIn("bmwm4", self.known)
+        self.assertEqual(self.sync.removed, 0)
+        self.sync.sync()
+        self.assertNotIn("bmwm4", self.known)
+        self.assertEqual(self.sync.removed, 1)
+
+    def test_reappearing_id_short_resets_its_misses(self):
+        self.sync.sync()
+        self.registry.id_shorts = ["BMW_X7"]
+        self.sync.sync()
+        self.registry.id_shorts = ["BMW_X7", "BMW_M4"]
+        self.sync.sync()
+        self.registry.id_shorts = ["BMW_X7"]
+        self.sync.sync()
+        self.assertIn("bmwm4", self.known)
+
+    def test_cars_configured_by_hand_are_kept(self):
+        self.known.add("audia4")
+        self.sync.sync()
+        self.sync.sync()
+        self.sync.sync()
+        self.assertIn("audia4", self.known)
+
+    def test_failed_refresh_changes_nothing(self):
+        self.sync.sync()
+        self.registry.refresh_ok = False
+        self.registry.id_shorts = []
+        for _ in range(3):
+            self.assertFalse(self.sync.sync())
+        self.assertEqual(self.known, {"bmwx7", "bmwm4"})
+
+
+if __name__ == '__main__':
+    unittest.main()
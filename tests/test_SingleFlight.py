@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from src.utils.SingleFlight import AsyncSingleFlight
+
+
+class AsyncSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_fetch(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch(auto_id):
+            calls.append(auto_id)
+            await asyncio.sleep(0.01)
+            return {"auto_id": auto_id}
+
+        results = await asyncio.gather(*(single_flight.do(("plan", "BMW_X7"), fetch, "BMW_X7") for _ in range(5)))
+        self.assertEqual(calls, ["BMW_X7"])
+        self.assertEqual(results, [{"auto_id": "BMW_X7"}] * 5)
+        self.assertEqual(single_flight.shared, 4)
+
+    async def test_different_keys_are_fetched_separately(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch(auto_id):
+            calls.append(auto_id)
+            await asyncio.sleep(0.01)
+            return auto_id
+
+        results = await asyncio.gather(single_flight.do("BMW_X7", fetch, "BMW_X7"),
+                                       single_flight.do("BMW_M4", fetch, "BMW_M4"))
+        self.assertEqual(results, ["BMW_X7", "BMW_M4"])
+        self.assertEqual(sorted(calls), ["BMW_M4", "BMW_X7"])
+
+    async def test_exception_is_shared_and_key_is_released(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("AAS unreachable")
+
+        results = await asyncio.gather(single_flight.do("key", fetch), single_flight.do("key", fetch),
+                                       return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        with self.assertRaises(ValueError):
+            await single_flight.do("key", fetch)
+        self.assertEqual(len(calls), 2)
+
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        single_flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "plan"
+
+        first = asyncio.ensure_future(single_flight.do("key", fetch))
+        second = asyncio.ensure_future(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, "plan")
+
+
+class AsyncSingleFlightLoopTest(unittest.TestCase):
+
+    def test_calls_on_different_loops_do_not_share_tasks(self):
+        single_flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "plan"
+
+        self.assertEqual(asyncio.run(single_flight.do("key", fetch)), "plan")
+        self.assertEqual(asyncio.run(single_flight.do("key", fetch)), "plan")
+        self.assertEqual(single_flight.shared, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
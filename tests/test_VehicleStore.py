@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from src.utils.VehicleStore import SQLiteVehicleStore
+
+CARS = {
+    "BMW X7": [{"RFID": "ANT1E00401002085C43D8"}, {"AutoID": "BMW_X7"}],
+    "BMW M4": [{"RFID": None}, {"AutoID": "BMW_M4"}],
+}
+
+
+class SQLiteVehicleStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SQLiteVehicleStore(os.path.join(self.directory, "vehicles.db"))
+        self.store.save_cars(CARS)
+
+    def tearDown(self):
+        self.store._connect().close()
+        shutil.rmtree(self.directory)
+
+    def test_get_cars_keeps_the_configuration_format(self):
+        self.assertEqual(self.store.get_cars(), CARS)
+
+    def test_lookups(self):
+        self.assertEqual(self.store.get_auto_id("ANT1E00401002085C43D8"), "BMW_X7")
+        self.assertEqual(self.store.get_car_name("BMW_X7"), "BMW X7")
+        self.assertEqual(self.store.get_rfid("BMW_X7"), "ANT1E00401002085C43D8")
+        self.assertIsNone(self.store.get_rfid("BMW_M4"))
+        self.assertIsNone(self.store.get_car_name("Audi_A4"))
+        self.assertEqual(self.store.normalized_auto_ids(), {"bmwx7", "bmwm4"})
+
+    def test_import_json_only_into_an_empty_store(self):
+        json_path = os.path.join(self.directory, "cars_config.json")
+        with open(json_path, "w") as file:
+            json.dump({"Audi A4": [{"RFID": "ANT1"}, {"AutoID": "Audi_A4"}]}, file)
+        self.assertFalse(self.store.import_json(json_path))
+        store = SQLiteVehicleStore(os.path.join(self.directory, "empty.db"))
+        self.assertFalse(store.import_json(os.path.join(self.directory, "missing.json")))
+        self.assertTrue(store.import_json(json_path))
+        self.assertEqual(store.get_auto_id("ANT1"), "Audi_A4")
+        store._connect().close()
+
+    def test_add_cars_compares_normalized_auto_ids(self):
+        self.assertIsNone(self.store.add_cars(["bmwx7"]))
+        self.assertTrue(self.store.add_cars(["Audi_A4", "AUDI_A4"]))
+        self.assertEqual(self.store.get_cars()["Audi A4"], [{"RFID": None}, {"AutoID": "Audi_A4"}])
+        self.assertEqual(len(self.store.get_cars()), 3)
+
+    def test_remove_cars(self):
+        self.assertIsNone(self.store.remove_cars(["Audi_A4"]))
+        self.assertTrue(self.store.remove_cars(["bmw_x7"]))
+        self.assertEqual(list(self.store.get_cars()), ["BMW M4"])
+
+    def test_set_rfid(self):
+        self.assertTrue(self.store.set_rfid("BMW_M4", "ANT2"))
+        self.assertEqual(self.store.get_auto_id("ANT2"), "BMW_M4")
+        self.assertFalse(self.store.set_rfid("Audi_A4", "ANT3"))
+
+    def test_set_rfids_is_one_transaction(self):
+        self.assertFalse(self.store.set_rfids({"BMW_M4": "ANT2", "Audi_A4": "ANT3"}))
+        self.assertIsNone(self.store.get_rfid("BMW_M4"))
+        self.assertTrue(self.store.set_rfids({"BMW_M4": "ANT2", "BMW_X7": None}))
+        self.assertEqual(self.store.get_rfid("BMW_M4"), "ANT2")
+        self.assertIsNone(self.store.get_rfid("BMW_X7"))
+
+    def test_concurrent_updates_are_not_lost(self):
+        auto_ids = [f"Car_{i}" for i in range(20)]
+        self.store.add_cars(auto_ids)
+
+        def set_rfid(auto_id):
+            self.store.set_rfid(auto_id, f"RFID_{auto_id}")
+            self.store._connect().close()
+
+        threads = [threading.Thread(target=set_rfid, args=(auto_id,)) for auto_id in auto_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([self.store.get_rfid(auto_id) for auto_id in auto_ids],
+                         [f"RFID_{auto_id}" for auto_id in auto_ids])
+
+
+if __name__ == '__main__':
+    unittest.main()
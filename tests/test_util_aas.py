@@ -0,0 +1,65 @@
+import json
+import unittest
+from src.utils.util_aas import JSONArrayStreamParser, encode_to_base64
+
+
+class EncodeToBase64Test(unittest.TestCase):
+
+    def test_encodes_utf8_text(self):
+        self.assertEqual(encode_to_base64("Hello, World!"), "SGVsbG8sIFdvcmxkIQ==")
+
+
+class JSONArrayStreamParserTest(unittest.TestCase):
+
+    ITEMS = [
+        {"idShort": "BMW_X7", "endpoints": [{"protocolInformation": {"href": "http://192.168.0.10:8081/shells/x"}}]},
+        1500.0, -0.25, 1e3, 2.5E-3, 42, 0, -7, True, False, None, "Prüfstand ✓", "a,b]c", [], {}, [1, [2.0, "]"]],
+    ]
+    METADATA = {"paging_metadata": {"cursor": "10"}, "note": "ö"}
+
+    def document(self, separators=(",", ":")):
+        return json.dumps({"result": self.ITEMS, **self.METADATA}, ensure_ascii=False,
+                          separators=separators).encode("utf-8")
+
+    def parse_in_chunks(self, document, chunk_size):
+        parser = JSONArrayStreamParser("result")
+        items = []
+        for start in range(0, len(document), chunk_size):
+            items.extend(parser.feed(document[start:start + chunk_size]))
+        return items, parser.close()
+
+    def test_every_chunk_size_yields_the_same_items(self):
+        for separators in ((",", ":"), (", ", ": ")):
+            document = self.document(separators)
+            for chunk_size in range(1, len(document) + 1):
+                with self.subTest(chunk_size=chunk_size, separators=separators):
+                    items, metadata = self.parse_in_chunks(document, chunk_size)
+                    self.assertEqual(items, self.ITEMS)
+                    self.assertEqual(metadata, {"result": [], **self.METADATA})
+
+    def test_number_split_after_the_decimal_point(self):
+        parser = JSONArrayStreamParser("result")
+        self.assertEqual(parser.feed('{"result": [1500.'), [])
+        self.assertEqual(parser.feed('0]}'), [1500.0])
+        self.assertEqual(parser.close(), {"result": []})
+
+    def test_number_split_in_the_exponent(self):
+        parser = JSONArrayStreamParser("result")
+        self.assertEqual(parser.feed('{"result": [1e'), [])
+        self.assertEqual(parser.feed('3, 2'), [1000.0])
+        self.assertEqual(parser.feed('5]}'), [25])
+
+    def test_document_without_the_array(self):
+        parser = JSONArrayStreamParser("result")
+        self.assertEqual(parser.feed(b'{"paging_metadata": {}}'), [])
+        self.assertEqual(parser.close(), {"paging_metadata": {}})
+
+    def test_malformed_item_raises_on_close(self):
+        parser = JSONArrayStreamParser("result")
+        parser.feed('{"result": [1, {"idShort": ')
+        with self.assertRaises(json.JSONDecodeError):
+            parser.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from unittest import mock
+from src.utils.util_bulk_rfid import (import_rfid_mapping, parse_rfid_csv, parse_rfid_json, parse_rfid_mapping,
+                                      validate_rfid_mapping)
+
+CAR_NAMES = {"BMW_X7": "BMW X7", "BMW_M4": "BMW M4", "Audi_A4": "Audi A4"}
+RFID_OWNERS = {"ANT1": "BMW_X7", "ANT9": "Audi_A4"}
+
+
+class ParseRfidMappingTest(unittest.TestCase):
+
+    def test_csv_without_header(self):
+        self.assertEqual(parse_rfid_csv("BMW_X7, ANT1\n\nBMW_M4,ANT2\nAudi_A4\n"),
+                         [("BMW_X7", "ANT1"), ("BMW_M4", "ANT2"), ("Audi_A4", "")])
+
+    def test_csv_header_in_any_order(self):
+        self.assertEqual(parse_rfid_csv("RFID,AutoID\nANT1,BMW_X7\n"), [("BMW_X7", "ANT1")])
+
+    def test_json_object_and_list(self):
+        self.assertEqual(parse_rfid_json('{"BMW_X7": "ANT1", "BMW_M4": null}'), [("BMW_X7", "ANT1"), ("BMW_M4", "")])
+        self.assertEqual(parse_rfid_json('[{"AutoID": "BMW_X7", "RFID": "ANT1"}, {"AutoID": "BMW_X7"}]'),
+                         [("BMW_X7", "ANT1"), ("BMW_X7", "")])
+
+    def test_invalid_content(self):
+        with self.assertRaises(ValueError):
+            parse_rfid_json('["BMW_X7"]')
+        with self.assertRaises(ValueError):
+            parse_rfid_json('{')
+        with self.assertRaises(ValueError):
+            parse_rfid_mapping("", "xml")
+
+
+class ValidateRfidMappingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = mock.Mock(loaded_at=1.0)
+        self.registry.get_all_idShorts.return_value = ["BMW_X7", "BMW_M4"]
+        self.set_car_rfids = mock.Mock(return_value=True)
+        patches = [
+            mock.patch("src.utils.util_bulk_rfid.get_registry", return_value=self.registry),
+            mock.patch("src.utils.util_bulk_rfid.get_car_name", side_effect=CAR_NAMES.get),
+            mock.patch("src.utils.util_bulk_rfid.get_auto_id", side_effect=RFID_OWNERS.get),
+            mock.patch("src.utils.util_bulk_rfid.set_car_rfids", self.set_car_rfids),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def reasons(self, rows, check_registry=True):
+        _, conflicts = validate_rfid_mapping(rows, check_registry)
+        return [(conflict["row"], conflict["reason"]) for conflict in conflicts]
+
+    def test_valid_mapping(self):
+        mapping, conflicts = validate_rfid_mapping([("BMW_X7", "ANT2"), ("BMW_M4", "ANT1"), ("BMW_M4", "ANT1")])
+        self.assertEqual(mapping, {"BMW_X7": "ANT2", "BMW_M4": "ANT1"})
+        self.assertEqual(conflicts, [])
+
+    def test_row_conflicts(self):
+        self.assertEqual(self.reasons([("BMW_X7", ""), ("VW_Golf", "ANT3"), ("Audi_A4", "ANT4")]), [
+            (1, "AutoID and RFID are required"),
+            (2, "AutoID is not in the car configuration"),
+            (3, "AutoID is not in the AAS registry"),
+        ])
+        self.assertEqual(self.reasons([("Audi_A4", "ANT4")], check_registry=False), [])
+
+    def test_duplicate_auto_ids_and_rfids(self):
+        self.assertEqual(self.reasons([("BMW_X7", "ANT2"), ("BMW_X7", "ANT3"), ("BMW_M4", "ANT2")]), [
+            (2, "AutoID was already given the RFID ANT2"),
+            (3, "RFID was already given to BMW_X7"),
+        ])
+
+    def test_rfid_of_a_car_that_keeps_it(self):
+        self.assertEqual(self.reasons([("BMW_X7", "ANT9")]), [(None, "RFID is already assigned to Audi_A4")])
+
+    def test_unavailable_registry(self):
+        self.registry.loaded_at = None
+        self.assertEqual(self.reasons([("BMW_X7", "ANT2")]), [(None, "AAS registry is unavailable")])
+
+    def test_import_is_all_or_nothing(self):
+        report = import_rfid_mapping([("BMW_X7", "ANT2"), ("VW_Golf", "ANT3")])
+        self.assertEqual((report["rows"], report["applied"], len(report["conflicts"])), (2, 0, 1))
+        self.set_car_rfids.assert_not_called()
+        self.assertEqual(import_rfid_mapping([("BMW_X7", "ANT2")], dry_run=True)["applied"], 0)
+        self.set_car_rfids.assert_not_called()
+        self.assertEqual(import_rfid_mapping([("BMW_X7", "ANT2")])["applied"], 1)
+        self.set_car_rfids.assert_called_once_with({"BMW_X7": "ANT2"})
+
+    def test_failed_save_is_reported(self):
+        self.set_car_rfids.return_value = False
+        report = import_rfid_mapping([("BMW_X7", "ANT2")])
+        self.assertEqual(report["applied"], 0)
+        self.assertEqual(report["error"], "Failed to save the RFIDs")
+
+
+if __name__ == '__main__':
+    unittest.main()
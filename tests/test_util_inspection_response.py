@@ -0,0 +1,27 @@
+import unittest
+from unittest import mock
+from src.utils import util_inspection_response
+from src.utils.util_inspection_response import compile_response_plan, create_response_plan
+
+INSPECTION_PLAN = {"Inspection_Plan": {"Engine_Hood": {"in_place": [True, False], "free_of_damage": [None]}}}
+
+
+class CompileResponsePlanTest(unittest.TestCase):
+
+    def test_compiled_plan_is_reused_while_the_config_file_is_missing(self):
+        with mock.patch.object(util_inspection_response, "inspection_plan_response_config_path", "/nonexistent.json"), \
+                mock.patch.object(util_inspection_response, "_response_config_checked_at", None):
+            first = compile_response_plan(INSPECTION_PLAN["Inspection_Plan"])
+            # Force the next call to check the file again
+            util_inspection_response._response_config_checked_at = None
+            self.assertIs(compile_response_plan(INSPECTION_PLAN["Inspection_Plan"]), first)
+
+    def test_slots_fall_back_to_their_default(self):
+        with mock.patch.object(util_inspection_response, "inspection_plan_response_config_path", "/nonexistent.json"), \
+                mock.patch.object(util_inspection_response, "_response_config_checked_at", None):
+            self.assertEqual(create_response_plan(INSPECTION_PLAN, {}),
+                             {"Response_Plan": {"Engine_Hood": {"in_place": False, "free_of_damage": None}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import unittest
+from src.utils import util_payload
+from src.utils.util_payload import CBOR, JSON, MSGPACK, decode_payload, get_accepted_content_types
+
+CAMERA_RESPONSE = {"detections": [[0.91, True, 0]], "classes": {"0": "Engine_Hood"}}
+
+
+class DecodePayloadTest(unittest.TestCase):
+
+    def test_json_is_the_default(self):
+        payload = json.dumps(CAMERA_RESPONSE).encode("utf-8")
+        self.assertEqual(decode_payload(payload), CAMERA_RESPONSE)
+        self.assertEqual(decode_payload(payload, "application/json; charset=utf-8"), CAMERA_RESPONSE)
+
+    @unittest.skipUnless(util_payload.msgpack, "msgpack is not installed")
+    def test_msgpack_and_its_aliases(self):
+        payload = util_payload.msgpack.packb(CAMERA_RESPONSE)
+        for content_type in (MSGPACK, "application/x-msgpack", "Application/Vnd.Msgpack"):
+            self.assertEqual(decode_payload(payload, content_type), CAMERA_RESPONSE)
+
+    @unittest.skipUnless(util_payload.cbor2, "cbor2 is not installed")
+    def test_cbor(self):
+        self.assertEqual(decode_payload(util_payload.cbor2.dumps(CAMERA_RESPONSE), CBOR), CAMERA_RESPONSE)
+
+    def test_invalid_payload_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            decode_payload(b"\xff\x00 not a payload")
+        for content_type in (MSGPACK, CBOR):
+            with self.assertRaises(ValueError):
+                decode_payload(b"\xc1", content_type)
+
+    def test_json_is_always_accepted_last(self):
+        content_types = get_accepted_content_types()
+        self.assertEqual(content_types[-1], JSON)
+        self.assertEqual(MSGPACK in content_types, util_payload.msgpack is not None)
+        self.assertEqual(CBOR in content_types, util_payload.cbor2 is not None)
+
+
+if __name__ == '__main__':
+    unittest.main()